@@ -0,0 +1,108 @@
+"""Per-request cost of ``PrometheusMiddleware``.
+
+Rebuilds ``main.app``'s route table with no-op endpoints and drives it
+through raw ASGI calls (no network, no client) with and without the
+middleware, so the difference is the middleware alone: route template
+lookup, labelled counter/histogram/gauge updates and the ``send`` wrapper.
+
+    python -m benchmarks.bench_metrics_overhead --iterations 20000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import re
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from main import app as main_app
+from src.core.middleware import PrometheusMiddleware
+
+
+async def noop():
+    return None
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    for route in main_app.routes:
+        if isinstance(route, APIRoute):
+            app.add_api_route(route.path, noop, methods=list(route.methods))
+    if instrumented:
+        app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+def sample_requests() -> list[tuple[str, str]]:
+    """One request per API route, path parameters filled with ``1``."""
+    requests = []
+    for route in main_app.routes:
+        if isinstance(route, APIRoute):
+            path = re.sub(r"{[^}]+}", "1", route.path)
+            requests.extend((method, path) for method in sorted(route.methods))
+    return requests
+
+
+async def drive(app: FastAPI, requests: list[tuple[str, str]], iterations: int):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scopes = [
+        {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        for method, path in requests
+    ]
+    start = time.perf_counter()
+    for i in range(iterations):
+        await app(dict(scopes[i % len(scopes)]), receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def bench(iterations: int, rounds: int) -> None:
+    requests = sample_requests()
+    plain, instrumented = build_app(False), build_app(True)
+    # warm up both, e.g. FastAPI builds the middleware stack on first call
+    await drive(plain, requests, len(requests))
+    await drive(instrumented, requests, len(requests))
+    # alternate and keep the best round of each to filter out GC and noise
+    base = with_metrics = float("inf")
+    for _ in range(rounds):
+        base = min(base, await drive(plain, requests, iterations))
+        with_metrics = min(
+            with_metrics, await drive(instrumented, requests, iterations)
+        )
+    print(f"{len(requests)} routes, best of {rounds} x {iterations} requests")
+    print(f"without middleware {base:8.2f} us/request")
+    print(f"with middleware    {with_metrics:8.2f} us/request")
+    print(
+        f"overhead           {with_metrics - base:8.2f} us/request "
+        f"({with_metrics / base - 1:+.1%})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(bench(args.iterations, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Per-row CPU cost of serving a 100-item todo page.
+
+Compares the ORM read path (joined ``Todo.user`` load, entity hydration,
+``from_attributes`` validation, ``jsonable_encoder``) with the projection
+path (``TodoResponse`` columns serialised by ``RowJSONResponse``). Runs
+against an in-memory SQLite database so only client-side CPU is measured.
+
+    python -m benchmarks.bench_todo_read_path --rows 100 --iterations 500
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from src.controllers.todos_controllers import TODO_RESPONSE_COLUMNS
+from src.core.responses import RowJSONResponse
+from src.models.models import Base, Todo, User
+from src.schemas.todo_schemas import TodoResponse
+
+todo_list_adapter = TypeAdapter(list[TodoResponse])
+
+# SQLite cannot render the Postgres-only search_vector column, so todos is
+# created by hand.
+TODOS_DDL = """
+CREATE TABLE todos (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(100) NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    completed BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    user_id INTEGER REFERENCES users (id),
+    search_vector TEXT
+)
+"""
+
+
+def orm_path(session: Session, limit: int) -> bytes:
+    stmt = select(Todo).options(joinedload(Todo.user)).order_by(Todo.id).limit(limit)
+    todos = session.execute(stmt).scalars().unique().all()
+    validated = todo_list_adapter.validate_python(todos, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def projection_path(session: Session, limit: int) -> bytes:
+    stmt = select(*TODO_RESPONSE_COLUMNS).order_by(Todo.id).limit(limit)
+    rows = session.execute(stmt).all()
+    return RowJSONResponse(rows).body
+
+
+def measure(func, session: Session, rows: int, iterations: int) -> float:
+    func(session, rows)
+    start = time.process_time()
+    for _ in range(iterations):
+        func(session, rows)
+        session.expunge_all()
+    return (time.process_time() - start) / (iterations * rows) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with Session(engine) as session:
+        session.execute(text(TODOS_DDL))
+        session.execute(
+            insert(User).values(
+                id=1, username="bench", email="bench@example.com", hash_password="x"
+            )
+        )
+        session.execute(
+            insert(Todo),
+            [
+                {
+                    "title": f"Todo {i}",
+                    "description": f"Description of todo {i}",
+                    "completed": i % 2 == 0,
+                    "user_id": 1,
+                }
+                for i in range(args.rows)
+            ],
+        )
+        session.commit()
+
+        before = measure(orm_path, session, args.rows, args.iterations)
+        after = measure(projection_path, session, args.rows, args.iterations)
+
+    print(f"rows per page:     {args.rows}")
+    print(f"ORM path:          {before:8.2f} us CPU/row")
+    print(f"projection path:   {after:8.2f} us CPU/row")
+    print(f"speedup:           {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
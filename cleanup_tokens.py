@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+import sys
+
+from src.database.db import sessionmanager
+from src.services.token_cleanup_service import cleanup_expired_tokens
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        report = await cleanup_expired_tokens(args.days_ahead)
+    finally:
+        await sessionmanager.close()
+    print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run one refresh_tokens partition maintenance pass"
+    )
+    parser.add_argument(
+        "--days-ahead",
+        type=int,
+        default=None,
+        help="partitions to keep ready beyond the refresh token lifetime",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from src.controllers.user_controllers import UsersController
+from src.database.db import sessionmanager
+from src.schemas.todo_schemas import TodoImportReport
+from src.services.import_service import TodoImportService
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(path: str):
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(stream.read, CHUNK_SIZE):
+            yield chunk
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+def progress_printer():
+    started = time.perf_counter()
+
+    def print_progress(report: TodoImportReport) -> None:
+        elapsed = time.perf_counter() - started
+        print(
+            f"imported={report.imported} failed={report.failed} "
+            f"elapsed={elapsed:.1f}s rate={report.imported / elapsed:.0f} rows/s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    return print_progress
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        async with sessionmanager.session() as db:
+            user = await UsersController(db).get_by_username(args.username)
+            if user is None:
+                print(f"User {args.username!r} not found", file=sys.stderr)
+                return 1
+            report = await TodoImportService(db).import_todos(
+                user.id,
+                read_chunks(args.path),
+                args.format,
+                on_progress=progress_printer(),
+            )
+    finally:
+        await sessionmanager.close()
+    print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import todos for a user")
+    parser.add_argument("username")
+    parser.add_argument("path", help="NDJSON/CSV file, or - for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    sys.exit(asyncio.run(main(parser.parse_args())))
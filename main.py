@@ -1,38 +1,80 @@
-from datetime import datetime, timezone, timedelta
 from contextlib import asynccontextmanager
-
-from fastapi import FastAPI, Depends, HTTPException, status, Request
-from slowapi.errors import RateLimitExceeded
-from fastapi.responses import JSONResponse
+from datetime import datetime, timezone
+import functools
+import os
+import time
+
+from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi.middleware.cors import CORSMiddleware
-
-from src.database.db import get_db, sessionmanager
+from fastapi.staticfiles import StaticFiles
+
+from src.conf.config import settings
+from src.core.hashing import password_hasher
+from src.core.metrics import SCHEDULER_JOB_FAILURES, SCHEDULER_JOB_SECONDS
+from src.core.middleware import PrometheusMiddleware, QueryStatsMiddleware
+from src.core.revocation import revocation_filter
+from src.database.db import get_read_db, sessionmanager
 from src.routes.v1 import todos_routes, auth_route, users_route
+from src.services.email_outbox_service import email_dispatcher
+from src.services.todo_stats_service import reconcile_todo_stats
+from src.services.token_cleanup_service import cleanup_expired_tokens
 
 scheduler = AsyncIOScheduler()
 
 
-async def cleanup_expired_tokens():
-    async with sessionmanager.session() as db:
-        time_now = datetime.now(timezone.utc)
-        cutoff = time_now - timedelta(days=7)
-        stmt = text(
-            "DELETE FROM refresh_tokens WHERE expired_at < :time_now OR revoked_at IS NOT NULL AND revoked_at < :cutoff"
-        )
-        await db.execute(stmt, {"time_now": time_now, "cutoff": cutoff})
-        await db.commit()
-        print(f"Cleaned up expired tokens [{time_now.strftime('%Y-%m-%d %H:%M:%S')}]")
+def timed_job(name: str, func):
+    """Wrap a scheduled coroutine so its runs show up in /metrics."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            SCHEDULER_JOB_FAILURES.labels(name).inc()
+            raise
+        finally:
+            SCHEDULER_JOB_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+    return wrapper
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    scheduler.add_job(cleanup_expired_tokens, "interval", hours=1)
+    scheduler.add_job(
+        timed_job("cleanup_expired_tokens", cleanup_expired_tokens),
+        "interval",
+        minutes=settings.TOKEN_CLEANUP_INTERVAL_MINUTES,
+        max_instances=1,
+        # also at startup: new refresh tokens need tomorrow's partitions now
+        next_run_time=datetime.now(timezone.utc),
+    )
+    scheduler.add_job(
+        timed_job("revocation_filter_load", revocation_filter.load),
+        "interval",
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+    )
+    scheduler.add_job(
+        timed_job("reconcile_todo_stats", reconcile_todo_stats),
+        "interval",
+        minutes=settings.TODO_STATS_RECONCILE_MINUTES,
+        max_instances=1,
+    )
     scheduler.start()
+    revocation_filter.start()
+    email_dispatcher.start()
+    await sessionmanager.warmup(settings.DB_POOL_WARMUP)
     yield
+    await revocation_filter.stop()
+    await email_dispatcher.stop()
     scheduler.shutdown()
+    password_hasher.shutdown()
+    await sessionmanager.close()
 
 
 app = FastAPI(
@@ -43,14 +85,6 @@ app = FastAPI(
 )
 
 
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={"message": "Rate limit exceeded"},
-    )
-
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -59,18 +93,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        server_timing=settings.DB_SERVER_TIMING,
+        repeated_threshold=settings.DB_REPEATED_QUERY_THRESHOLD,
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 app.include_router(todos_routes.router, prefix="/api/v1")
 app.include_router(auth_route.router, prefix="/api/v1")
 app.include_router(users_route.router, prefix="/api/v1")
 
+if settings.AVATAR_STORAGE == "local":
+    os.makedirs(settings.AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(
+        settings.AVATAR_LOCAL_URL,
+        StaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars",
+    )
+
 
 @app.get("/")
 async def read_root():
     return {"message": "Todo app v1.0.0"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/healthChecker")
-async def health_checker(db: AsyncSession = Depends(get_db)):
+async def health_checker(db: AsyncSession = Depends(get_read_db)):
     try:
         result = await db.execute(text("SELECT 1"))
         result = result.fetchone()
@@ -0,0 +1,31 @@
+"""Add users avatar_hash
+
+Revision ID: 0a7c3e5f9d61
+Revises: f5a1c9e4b276
+Create Date: 2026-10-18 19:04:26.381950
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0a7c3e5f9d61"
+down_revision: Union[str, None] = "f5a1c9e4b276"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users", sa.Column("avatar_hash", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "avatar_hash")
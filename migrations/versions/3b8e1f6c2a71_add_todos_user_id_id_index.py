@@ -0,0 +1,29 @@
+"""Add todos (user_id, id) index
+
+Revision ID: 3b8e1f6c2a71
+Revises: fe7285819a93
+Create Date: 2026-10-18 10:12:40.512304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8e1f6c2a71"
+down_revision: Union[str, None] = "fe7285819a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_todos_user_id_id", "todos", ["user_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_user_id_id", table_name="todos")
@@ -0,0 +1,55 @@
+"""Add todos listing filter/sort indexes
+
+Revision ID: 5f3a9c1d7b24
+Revises: 8d2c4a9e7f10
+Create Date: 2026-10-18 14:05:11.207391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5f3a9c1d7b24"
+down_revision: Union[str, None] = "8d2c4a9e7f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_todos_user_id_completed_created_at",
+        "todos",
+        ["user_id", "completed", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_todos_user_id_created_at_id",
+        "todos",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_todos_user_id_updated_at_id",
+        "todos",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_todos_user_id_updated_at_id_open",
+        "todos",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("NOT completed"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todos_user_id_updated_at_id_open", table_name="todos")
+    op.drop_index("ix_todos_user_id_updated_at_id", table_name="todos")
+    op.drop_index("ix_todos_user_id_created_at_id", table_name="todos")
+    op.drop_index("ix_todos_user_id_completed_created_at", table_name="todos")
@@ -0,0 +1,54 @@
+"""Add todos full-text search vector
+
+Revision ID: 8d2c4a9e7f10
+Revises: 3b8e1f6c2a71
+Create Date: 2026-10-18 14:02:11.873514
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2c4a9e7f10"
+down_revision: Union[str, None] = "3b8e1f6c2a71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column(
+        "todos",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_todos_user_id_search_vector",
+        "todos",
+        ["user_id", "search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_todos_user_id_search_vector",
+        table_name="todos",
+        postgresql_using="gin",
+    )
+    op.drop_column("todos", "search_vector")
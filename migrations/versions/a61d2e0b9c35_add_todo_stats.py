@@ -0,0 +1,44 @@
+"""Add todo_stats counter table
+
+Revision ID: a61d2e0b9c35
+Revises: 5f3a9c1d7b24
+Create Date: 2026-10-18 15:21:48.640117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a61d2e0b9c35"
+down_revision: Union[str, None] = "5f3a9c1d7b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "todo_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        "INSERT INTO todo_stats (user_id, total, completed, updated_at) "
+        "SELECT users.id, count(todos.id), count(todos.id) FILTER "
+        "(WHERE todos.completed), now() "
+        "FROM users LEFT JOIN todos ON todos.user_id = users.id "
+        "GROUP BY users.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("todo_stats")
@@ -0,0 +1,43 @@
+"""Add refresh_tokens family_id
+
+Revision ID: c7e3b5a1f902
+Revises: a61d2e0b9c35
+Create Date: 2026-10-18 16:02:37.115820
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e3b5a1f902"
+down_revision: Union[str, None] = "a61d2e0b9c35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_tokens", sa.Column("family_id", sa.String(length=32), nullable=True)
+    )
+    # Existing tokens were never linked, so each starts its own family.
+    op.execute(
+        "UPDATE refresh_tokens SET family_id = md5(id::text || random()::text) "
+        "WHERE family_id IS NULL"
+    )
+    op.alter_column("refresh_tokens", "family_id", nullable=False)
+    op.create_index(
+        op.f("ix_refresh_tokens_family_id"),
+        "refresh_tokens",
+        ["family_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_family_id"), table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "family_id")
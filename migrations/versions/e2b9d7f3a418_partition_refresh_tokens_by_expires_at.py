@@ -0,0 +1,103 @@
+"""Partition refresh_tokens by day on expires_at
+
+Revision ID: e2b9d7f3a418
+Revises: d4f8a2c6e193
+Create Date: 2026-10-18 17:31:54.218663
+
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.conf.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9d7f3a418"
+down_revision: Union[str, None] = "d4f8a2c6e193"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The same horizon the cleanup job maintains, so the app can issue tokens
+# for REFRESH_TOKEN_PARTITION_DAYS_AHEAD days before the job first runs.
+DAYS_AHEAD = (
+    settings.REFRESH_TOKEN_EXPIRE_DAYS + settings.REFRESH_TOKEN_PARTITION_DAYS_AHEAD
+)
+
+
+def _create_partition(table: str, day: date) -> None:
+    op.execute(
+        f"CREATE TABLE refresh_tokens_p{day:%Y%m%d} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+        f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+    )
+
+
+def _swap_table(new_table: str) -> None:
+    op.execute(
+        f"INSERT INTO {new_table} SELECT * FROM refresh_tokens ORDER BY expires_at"
+    )
+    op.execute(f"ALTER SEQUENCE refresh_tokens_id_seq OWNED BY {new_table}.id")
+    op.drop_table("refresh_tokens")
+    op.rename_table(new_table, "refresh_tokens")
+    op.create_foreign_key(
+        "refresh_tokens_user_id_fkey", "refresh_tokens", "users", ["user_id"], ["id"]
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_family_id"),
+        "refresh_tokens",
+        ["family_id"],
+        unique=False,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    today = datetime.now(timezone.utc).date()
+    op.execute(
+        "CREATE TABLE refresh_tokens_partitioned "
+        "(LIKE refresh_tokens INCLUDING DEFAULTS) PARTITION BY RANGE (expires_at)"
+    )
+    day = today
+    while day <= today + timedelta(days=DAYS_AHEAD):
+        _create_partition("refresh_tokens_partitioned", day)
+        day += timedelta(days=1)
+    # Already expired tokens are dropped rather than copied: they have no
+    # partition to go to and are useless anyway.
+    op.execute("DELETE FROM refresh_tokens WHERE expires_at <= now()")
+    _swap_table("refresh_tokens_partitioned")
+    op.create_primary_key("refresh_tokens_pkey", "refresh_tokens", ["id", "expires_at"])
+    op.create_index(
+        op.f("ix_refresh_tokens_token_hash"),
+        "refresh_tokens",
+        ["token_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "CREATE TABLE refresh_tokens_plain (LIKE refresh_tokens INCLUDING DEFAULTS)"
+    )
+    _swap_table("refresh_tokens_plain")
+    op.create_primary_key("refresh_tokens_pkey", "refresh_tokens", ["id"])
+    op.create_unique_constraint(
+        "refresh_tokens_token_hash_key", "refresh_tokens", ["token_hash"]
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_expires_at"),
+        "refresh_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_refresh_tokens_revoked_at",
+        "refresh_tokens",
+        ["revoked_at"],
+        unique=False,
+        postgresql_where=sa.text("revoked_at IS NOT NULL"),
+    )
@@ -1,2 +1,9 @@
 TITLE_MIN_LENGTH = 3
 TITLE_MAX_LENGTH = 100
+BULK_MAX_ITEMS = 100
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+SEARCH_CONFIG = "simple"
+TODO_STATS_RECONCILE_BATCH_SIZE = 500
@@ -1,7 +1,7 @@
 from typing import List, Sequence, TypeVar, Type
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
@@ -26,14 +26,26 @@ class BaseController:
         return result.scalar_one_or_none()
 
     async def create(self, instance: ModelType) -> ModelType:
+        # eager_defaults fetches generated columns through INSERT ... RETURNING
         self.db.add(instance)
         await self.db.commit()
-        await self.db.refresh(instance)
         return instance
 
     async def update(self, instance: ModelType) -> ModelType:
         await self.db.commit()
-        await self.db.refresh(instance)
+        return instance
+
+    async def update_where(self, values: dict, *criteria) -> ModelType | None:
+        stmt = (
+            update(self.model)
+            .where(*criteria)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        instance = result.scalar_one_or_none()
+        await self.db.commit()
         return instance
 
     async def delete(self, instance: ModelType) -> None:
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+import logging
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.models import EmailOutbox
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class EmailOutboxController:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def enqueue(self, recipient: str, subject: str, template: str, context: dict):
+        """Stage a message in the caller's transaction; it is only visible to
+        the dispatcher once the caller commits."""
+        self.db.add(
+            EmailOutbox(
+                recipient=recipient, subject=subject, template=template, context=context
+            )
+        )
+
+    async def claim_batch(self, limit: int, lease: timedelta) -> list[Row]:
+        """Lease up to ``limit`` due messages and commit.
+
+        SKIP LOCKED lets several dispatchers share the table; a message whose
+        dispatcher dies becomes due again when its lease runs out.
+        """
+        due = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status == "pending",
+                EmailOutbox.next_attempt_at <= func.now(),
+            )
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=func.now() + lease,
+            )
+            .returning(
+                EmailOutbox.id,
+                EmailOutbox.recipient,
+                EmailOutbox.subject,
+                EmailOutbox.template,
+                EmailOutbox.context,
+                EmailOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        claimed = sorted(result.all(), key=lambda row: row.id)
+        await self.db.commit()
+        return claimed
+
+    async def mark_sent(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids))
+            .values(status="sent", sent_at=func.now(), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def mark_failed(self, failures: list[tuple[int, str, datetime | None]]):
+        """Record (id, error, retry at) for each failed message; a retry time of
+        None gives up on the message."""
+        if not failures:
+            return
+        await self.db.execute(
+            update(EmailOutbox),
+            [
+                {
+                    "id": _id,
+                    "last_error": error[:1000],
+                    "status": "pending" if retry_at else "failed",
+                    "next_attempt_at": retry_at or datetime.now(timezone.utc),
+                }
+                for _id, error, retry_at in failures
+            ],
+        )
+        await self.db.commit()
@@ -1,17 +1,23 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import List, Sequence
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, insert, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from src.controllers.base import BaseController
-from src.models.models import RefreshToken
+from src.models.models import RefreshToken, User
 from src.schemas.user_schemas import UserResponse, UserSchema, UserCreate
 
 logger = logging.getLogger("uvicorn.error")
 
+PARTITION_PREFIX = "refresh_tokens_p"
+
+
+def _partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
 
 class RefreshTokenController(BaseController):
     def __init__(self, session: AsyncSession):
@@ -20,26 +26,11 @@ class RefreshTokenController(BaseController):
             RefreshToken,
         )
 
-    async def get_by_token_hash(self, token_hash: str) -> RefreshToken | None:
-        stmt = select(self.model).where(RefreshToken.token_hash == token_hash)
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
-
-    async def get_active_token(
-        self, token_hash: str, current_time: datetime
-    ) -> RefreshToken | None:
-        stmt = select(self.model).where(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.expires_at > current_time,
-            RefreshToken.revoked_at is None,
-        )
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
-
     async def create_token(
         self,
         user_id: int,
         token_hash: str,
+        family_id: str,
         expires_at: datetime,
         ip_address: str,
         user_agent: str,
@@ -47,12 +38,127 @@ class RefreshTokenController(BaseController):
         refresh_token = RefreshToken(
             user_id=user_id,
             token_hash=token_hash,
+            family_id=family_id,
             expires_at=expires_at,
             ip_address=ip_address,
             user_agent=user_agent,
         )
         return await self.create(refresh_token)
 
-    async def revoke_token(self, refresh_token: RefreshToken) -> None:
-        refresh_token.revoked_at = datetime.now()
+    async def get_partitions(self) -> dict[date, float]:
+        """Daily partitions of refresh_tokens keyed by their first day, with
+        the planner's row estimate for each."""
+        result = await self.db.execute(
+            text(
+                "SELECT c.relname, c.reltuples FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass"
+            )
+        )
+        partitions = {}
+        for name, reltuples in result.all():
+            if name.startswith(PARTITION_PREFIX):
+                day = datetime.strptime(name[len(PARTITION_PREFIX) :], "%Y%m%d")
+                partitions[day.date()] = max(reltuples, 0)
+        return partitions
+
+    async def create_partition(self, day: date) -> None:
+        # Bounds are UTC midnights, so a partition holds exactly one UTC day.
+        await self.db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} "
+                f"PARTITION OF refresh_tokens FOR VALUES "
+                f"FROM ('{day.isoformat()} 00:00:00+00') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+            )
+        )
+        await self.db.commit()
+
+    async def drop_partition(self, day: date) -> None:
+        await self.db.execute(text(f"DROP TABLE IF EXISTS {_partition_name(day)}"))
+        await self.db.commit()
+
+    async def revoke_token(self, token_hash: str) -> None:
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(stmt)
         await self.db.commit()
+
+    async def rotate_token(
+        self,
+        token_hash: str,
+        new_token_hash: str,
+        expires_at: datetime,
+        ip_address: str | None,
+        user_agent: str | None,
+    ) -> Row | None:
+        """Consume an active token and issue its successor in one transaction.
+
+        The conditional UPDATE is the only check, so of two concurrent
+        refreshes with the same token exactly one gets a row back. Returns
+        (user_id, username) or None when the token cannot be rotated; if the
+        token was already revoked its whole family is revoked as well.
+        """
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+                User.id == RefreshToken.user_id,
+            )
+            .values(revoked_at=func.now())
+            .returning(RefreshToken.family_id, User.id, User.username)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        consumed = result.one_or_none()
+        if consumed is None:
+            await self._revoke_family_on_reuse(token_hash)
+            return None
+        await self.db.execute(
+            insert(RefreshToken).values(
+                user_id=consumed.id,
+                token_hash=new_token_hash,
+                family_id=consumed.family_id,
+                expires_at=expires_at,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+        )
+        await self.db.commit()
+        return consumed
+
+    async def _revoke_family_on_reuse(self, token_hash: str) -> None:
+        stmt = select(RefreshToken.family_id, RefreshToken.user_id).where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_not(None),
+            RefreshToken.expires_at > func.now(),
+        )
+        reused = (await self.db.execute(stmt)).one_or_none()
+        if reused is None:
+            return
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.family_id == reused.family_id,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        logger.warning(
+            f"Refresh token reuse for user {reused.user_id}: "
+            f"revoked {result.rowcount} tokens in family {reused.family_id}"
+        )
@@ -0,0 +1,95 @@
+import logging
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.models import Todo, TodoStats, User
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class TodoStatsController:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_stats(self, user_id: int) -> Row | None:
+        stmt = select(TodoStats.total, TodoStats.completed).where(
+            TodoStats.user_id == user_id
+        )
+        result = await self.db.execute(stmt)
+        return result.one_or_none()
+
+    async def apply_delta(self, user_id: int, total: int, completed: int) -> None:
+        """Add deltas to the user's counters inside the caller's transaction.
+
+        Callers run this after their todos writes so the counter row lock is
+        always taken last and held only until commit.
+        """
+        if not total and not completed:
+            return
+        stmt = insert(TodoStats).values(
+            user_id=user_id, total=total, completed=completed, updated_at=func.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TodoStats.user_id],
+            set_={
+                "total": TodoStats.total + stmt.excluded.total,
+                "completed": TodoStats.completed + stmt.excluded.completed,
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def reconcile_batch(self, after_id: int, batch_size: int) -> tuple[int, int]:
+        """Recount todos for the next ``batch_size`` users after ``after_id``
+        and overwrite counters that drifted.
+
+        Returns (last user id seen, repaired rows); last id is 0 when there
+        are no users left.
+        """
+        result = await self.db.execute(
+            select(User.id)
+            .where(User.id > after_id)
+            .order_by(User.id)
+            .limit(batch_size)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            return 0, 0
+        # Lock existing counters first: writers that already touched todos
+        # wait on this lock, so their delta lands on top of our recount.
+        await self.db.execute(
+            select(TodoStats.user_id)
+            .where(TodoStats.user_id.in_(user_ids))
+            .with_for_update()
+        )
+        counts = (
+            select(
+                User.id.label("user_id"),
+                func.count(Todo.id).label("total"),
+                func.count(Todo.id).filter(Todo.completed).label("completed"),
+                func.now().label("updated_at"),
+            )
+            .select_from(User)
+            .outerjoin(Todo, Todo.user_id == User.id)
+            .where(User.id.in_(user_ids))
+            .group_by(User.id)
+        )
+        stmt = insert(TodoStats).from_select(
+            ["user_id", "total", "completed", "updated_at"], counts
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TodoStats.user_id],
+            set_={
+                "total": stmt.excluded.total,
+                "completed": stmt.excluded.completed,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=(TodoStats.total != stmt.excluded.total)
+            | (TodoStats.completed != stmt.excluded.completed),
+        ).returning(TodoStats.user_id)
+        result = await self.db.execute(stmt)
+        repaired = len(result.all())
+        await self.db.commit()
+        return user_ids[-1], repaired
@@ -1,57 +1,307 @@
-from typing import List, Sequence
+from typing import AsyncIterator, List, Sequence
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer,
+    REAL,
+    Row,
+    any_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from src.conf import containts
+from src.controllers.todo_stats_controllers import TodoStatsController
 from src.models.models import Todo, User
 from src.schemas.todo_schemas import (
     TodoSchemaUpdate,
     TodoUpdateStatusSchema,
     TodoSchema,
+    TodoFilterParams,
 )
 
 logger = logging.getLogger("uvicorn.error")
 
+TODO_RESPONSE_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.completed,
+    Todo.created_at,
+    Todo.updated_at,
+)
+
+
+def _ids_param(ids: list[int]):
+    return any_(literal(ids, ARRAY(Integer)))
+
+
+SORT_COLUMNS = {
+    "id": Todo.id,
+    "created_at": Todo.created_at,
+    "updated_at": Todo.updated_at,
+    "title": Todo.title,
+}
+
+
+def _filtered_todos(user: User, filters: TodoFilterParams):
+    stmt = select(*TODO_RESPONSE_COLUMNS).where(Todo.user_id == user.id)
+    if filters.completed is not None:
+        stmt = stmt.where(Todo.completed == filters.completed)
+    if filters.created_after is not None:
+        stmt = stmt.where(Todo.created_at >= filters.created_after)
+    if filters.created_before is not None:
+        stmt = stmt.where(Todo.created_at < filters.created_before)
+    if filters.updated_after is not None:
+        stmt = stmt.where(Todo.updated_at >= filters.updated_after)
+    if filters.updated_before is not None:
+        stmt = stmt.where(Todo.updated_at < filters.updated_before)
+    return stmt
+
+
+def _todo_ordering(filters: TodoFilterParams) -> list:
+    columns = [SORT_COLUMNS[filters.sort]]
+    if columns[0] is not Todo.id:
+        columns.append(Todo.id)
+    if filters.order == "desc":
+        return [column.desc() for column in columns]
+    return columns
+
 
 class TodosController:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.stats = TodoStatsController(db)
 
-    async def get_todos(self, limit: int, offset: int, user: User) -> Sequence[Todo]:
-        stmt = select(Todo).filter_by(user_id=user.id).limit(limit).offset(offset)
+    async def get_todos(
+        self, limit: int, offset: int, user: User, filters: TodoFilterParams
+    ) -> Sequence[Row]:
+        stmt = (
+            _filtered_todos(user, filters)
+            .order_by(*_todo_ordering(filters))
+            .limit(limit)
+            .offset(offset)
+        )
         todos = await self.db.execute(stmt)
-        return todos.scalars().all()
+        return todos.all()
 
-    async def get_todo_by_id(self, todo_id: int, user: User) -> Todo:
-        stmt = select(Todo).filter_by(id=todo_id, user_id=user.id)
+    async def get_todos_after(
+        self, limit: int, after: tuple | None, user: User, filters: TodoFilterParams
+    ) -> Sequence[Row]:
+        """Keyset page ordered by (sort column, id); ``after`` is the
+        (sort value, id) pair of the previous page's last row."""
+        stmt = _filtered_todos(user, filters)
+        if after is not None:
+            column = SORT_COLUMNS[filters.sort]
+            key = Todo.id if column is Todo.id else tuple_(column, Todo.id)
+            value = after[1] if column is Todo.id else tuple_(*after)
+            stmt = stmt.where(key > value if filters.order == "asc" else key < value)
+        stmt = stmt.order_by(*_todo_ordering(filters)).limit(limit)
+        todos = await self.db.execute(stmt)
+        return todos.all()
+
+    async def search_todos(
+        self,
+        query: str,
+        limit: int,
+        after: tuple[float, int] | None,
+        user: User,
+    ) -> Sequence[Row]:
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{containts.SEARCH_CONFIG}'"), query
+        )
+        rank = func.ts_rank(Todo.search_vector, ts_query)
+        stmt = select(*TODO_RESPONSE_COLUMNS, rank.label("rank")).where(
+            Todo.user_id == user.id, Todo.search_vector.op("@@")(ts_query)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(
+                tuple_(rank, Todo.id) < tuple_(cast(after_rank, REAL), after_id)
+            )
+        stmt = stmt.order_by(rank.desc(), Todo.id.desc()).limit(limit)
+        todos = await self.db.execute(stmt)
+        return todos.all()
+
+    async def stream_todos(
+        self, user_id: int, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        stmt = (
+            select(*TODO_RESPONSE_COLUMNS)
+            .where(Todo.user_id == user_id)
+            .order_by(Todo.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_todo_by_id(self, todo_id: int, user: User) -> Row | None:
+        stmt = select(*TODO_RESPONSE_COLUMNS).where(
+            Todo.id == todo_id, Todo.user_id == user.id
+        )
         todo = await self.db.execute(stmt)
-        return todo.scalar_one_or_none()
+        return todo.one_or_none()
 
-    async def create_todo(self, todo: TodoSchema, user: User) -> Todo:
-        new_todo = Todo(**todo.model_dump(), user=user)
-        self.db.add(new_todo)
+    async def create_todo(self, todo: TodoSchema, user: User) -> Row:
+        stmt = (
+            insert(Todo)
+            .values(**todo.model_dump(), user_id=user.id)
+            .returning(*TODO_RESPONSE_COLUMNS)
+        )
+        result = await self.db.execute(stmt)
+        new_todo = result.one()
+        await self.stats.apply_delta(user.id, 1, int(new_todo.completed))
         await self.db.commit()
-        await self.db.refresh(new_todo)
         return new_todo
 
     async def remove_todo(self, todo_id: int, user: User) -> None:
-        todo = await self.get_todo_by_id(todo_id, user)
-        if todo is None:
+        stmt = (
+            delete(Todo)
+            .where(Todo.id == todo_id, Todo.user_id == user.id)
+            .returning(Todo.completed)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        completed = result.scalar_one_or_none()
+        if completed is None:
             raise HTTPException(status_code=404, detail="Todo not found")
-        await self.db.delete(todo)
+        await self.stats.apply_delta(user.id, -1, -int(completed))
         await self.db.commit()
 
     async def update_todo(
         self, todo_id: int, todo: TodoSchemaUpdate | TodoUpdateStatusSchema, user: User
-    ) -> Todo | None:
-        todo_to_update = await self.get_todo_by_id(todo_id, user)
-        if todo_to_update is None:
-            raise HTTPException(status_code=404, detail="Todo not found")
+    ) -> Row | None:
         update_data = todo.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(todo_to_update, key, value)
+        if not update_data:
+            return await self.get_todo_by_id(todo_id, user)
+        was_completed = None
+        if "completed" in update_data:
+            was_completed = await self._lock_completed([todo_id], user)
+        stmt = (
+            update(Todo)
+            .where(Todo.id == todo_id, Todo.user_id == user.id)
+            .values(**update_data)
+            .returning(*TODO_RESPONSE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        todo_updated = result.one_or_none()
+        if todo_updated is None:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        if was_completed is not None:
+            delta = int(todo_updated.completed) - int(was_completed[todo_id])
+            await self.stats.apply_delta(user.id, 0, delta)
         await self.db.commit()
-        await self.db.refresh(todo_to_update)
-        return todo_to_update
+        return todo_updated
+
+    async def create_todos(self, todos: list[TodoSchema], user: User) -> list[Row]:
+        stmt = (
+            insert(Todo)
+            .values([{**todo.model_dump(), "user_id": user.id} for todo in todos])
+            .returning(*TODO_RESPONSE_COLUMNS)
+        )
+        result = await self.db.execute(stmt)
+        rows = sorted(result.all(), key=lambda row: row.id)
+        await self.stats.apply_delta(
+            user.id, len(rows), sum(row.completed for row in rows)
+        )
+        await self.db.commit()
+        return rows
+
+    async def update_todos_status(
+        self, statuses: dict[int, bool], user: User
+    ) -> dict[int, Row]:
+        was_completed = await self._lock_completed(list(statuses), user)
+        updated = {}
+        for completed in (True, False):
+            ids = [_id for _id, value in statuses.items() if value is completed]
+            if not ids:
+                continue
+            stmt = (
+                update(Todo)
+                .where(Todo.user_id == user.id, Todo.id == _ids_param(ids))
+                .values(completed=completed)
+                .returning(*TODO_RESPONSE_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated.update({row.id: row for row in result.all()})
+        delta = sum(
+            int(row.completed) - int(was_completed[_id]) for _id, row in updated.items()
+        )
+        await self.stats.apply_delta(user.id, 0, delta)
+        await self.db.commit()
+        return updated
+
+    async def remove_todos(self, ids: list[int], user: User) -> set[int]:
+        stmt = (
+            delete(Todo)
+            .where(Todo.user_id == user.id, Todo.id == _ids_param(ids))
+            .returning(Todo.id, Todo.completed)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        rows = result.all()
+        await self.stats.apply_delta(
+            user.id, -len(rows), -sum(row.completed for row in rows)
+        )
+        await self.db.commit()
+        return {row.id for row in rows}
+
+    async def copy_todos(self, user_id: int, records: list[tuple]) -> int:
+        """COPY (title, description, completed) records into a per-connection
+        staging table and merge them into todos in one transaction."""
+        await self.db.execute(
+            text(
+                "CREATE TEMP TABLE IF NOT EXISTS todos_import ("
+                f"title varchar({containts.TITLE_MAX_LENGTH}) NOT NULL, "
+                "description varchar(255) NOT NULL, "
+                "completed boolean NOT NULL"
+                ") ON COMMIT DELETE ROWS"
+            )
+        )
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "todos_import",
+            records=records,
+            columns=["title", "description", "completed"],
+        )
+        result = await self.db.execute(
+            text(
+                "INSERT INTO todos "
+                "(title, description, completed, created_at, updated_at, user_id) "
+                "SELECT title, description, completed, now(), now(), :user_id "
+                "FROM todos_import"
+            ),
+            {"user_id": user_id},
+        )
+        inserted = result.rowcount
+        completed = sum(1 for record in records if record[2])
+        await self.stats.apply_delta(user_id, inserted, completed)
+        await self.db.commit()
+        return inserted
+
+    async def _lock_completed(self, ids: list[int], user: User) -> dict[int, bool]:
+        """Lock the rows about to change and return their current status, so
+        the counter delta reflects what the UPDATE actually flipped."""
+        stmt = (
+            select(Todo.id, Todo.completed)
+            .where(Todo.user_id == user.id, Todo.id == _ids_param(ids))
+            .order_by(Todo.id)
+            .with_for_update()
+        )
+        result = await self.db.execute(stmt)
+        return {row.id: row.completed for row in result.all()}
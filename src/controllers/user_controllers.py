@@ -36,13 +36,11 @@ class UsersController(BaseController):
         return await self.create(user)
 
     async def confirmed_email(self, email: str) -> User | None:
-        user = await self.get_user_by_email(email)
-        user.confirmed = True
-        await self.db.commit()
-
-    async def update_avatar_url(self, email: str, url: str) -> User:
-        user = await self.get_user_by_email(email)
-        user.avatar = url
-        await self.db.commit()
-        await self.db.refresh(user)
-        return user
+        return await self.update_where({"confirmed": True}, User.email == email)
+
+    async def update_avatar_url(
+        self, email: str, url: str, avatar_hash: str | None = None
+    ) -> User | None:
+        return await self.update_where(
+            {"avatar": url, "avatar_hash": avatar_hash}, User.email == email
+        )
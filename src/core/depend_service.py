@@ -1,10 +1,15 @@
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 
-from src.database.db import get_db
+from src.database.db import get_db, pin_to_primary, sessionmanager
 from src.services.auth_service import AuthService, oauth2_scheme
+from src.services.avatar_service import AvatarService
+from src.services.upload_file_service import get_avatar_storage
 from src.services.user_sevice import UserService
-from src.models.models import User, UserRole
+from src.models.models import UserRole
+from src.schemas.user_schemas import UserSnapshot
 
 
 def get_auth_service(db: AsyncSession = Depends(get_db)):
@@ -15,20 +20,34 @@ def get_user_service(db: AsyncSession = Depends(get_db)):
     return UserService(db)
 
 
-async def get_current_user(
-    auth_service: AuthService = Depends(get_auth_service),
-    token: str = Depends(oauth2_scheme),
-):
-    return await auth_service.get_current_user(token)
+def get_avatar_service(db: AsyncSession = Depends(get_db)):
+    return AvatarService(db, get_avatar_storage())
+
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_current_moderator(current_user: User = Depends(get_current_user)):
+
+async def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme)
+) -> AsyncIterator[UserSnapshot]:
+    # Sessions connect lazily, so a cache hit never checks out a connection.
+    async with sessionmanager.session() as db:
+        user = await AuthService(db).get_current_user(token)
+    yield user
+    # Runs once the handler has returned, i.e. after its commit and before
+    # the response is sent, so the pin window starts at the write however
+    # long the request took. Failed requests are not pinned.
+    if request.method not in SAFE_METHODS:
+        await pin_to_primary(user.username)
+
+
+def get_current_moderator(current_user: UserSnapshot = Depends(get_current_user)):
     if current_user.role not in [UserRole.ADMIN, UserRole.MODERATOR]:
         raise HTTPException(status_code=403, detail="Forbidden")
     return current_user
 
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+def get_current_admin(current_user: UserSnapshot = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Forbidden")
 
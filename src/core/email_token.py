@@ -4,6 +4,7 @@ import jwt
 from fastapi import HTTPException, status
 
 from src.conf.config import settings
+from src.core.token_cache import verified_tokens
 
 
 def create_email_token(data: dict) -> str:
@@ -16,9 +17,7 @@ def create_email_token(data: dict) -> str:
 
 def get_email_from_token(token: str):
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = verified_tokens.decode(token)
         email = payload.get("sub")
         return email
     except jwt.PyJWTError as e:
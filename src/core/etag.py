@@ -0,0 +1,20 @@
+import hashlib
+
+
+def make_etag(*parts: object) -> str:
+    return '"' + ".".join(str(part) for part in parts) + '"'
+
+
+def query_digest(query_items: list[tuple[str, str]]) -> str:
+    canonical = "&".join(f"{key}={value}" for key, value in sorted(query_items))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison function (RFC 9110, 13.1.2).
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
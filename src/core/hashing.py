@@ -0,0 +1,76 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+from src.core.metrics import (
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_SECONDS,
+)
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool with a bounded admission queue.
+
+    bcrypt releases the GIL, so threads keep the event loop responsive. Once
+    ``pool_size + queue_size`` operations are in flight new requests get a 503
+    instead of piling up behind the pool.
+    """
+
+    def __init__(self, pool_size: int, queue_size: int):
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="bcrypt"
+        )
+
+    def _update_gauges(self) -> None:
+        PASSWORD_HASH_IN_FLIGHT.set(self._in_flight)
+        PASSWORD_HASH_QUEUE_DEPTH.set(max(0, self._in_flight - self.pool_size))
+
+    async def _run(self, operation: str, func, *args):
+        if self._in_flight >= self.pool_size + self.queue_size:
+            PASSWORD_HASH_REJECTED.labels(operation).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self._in_flight += 1
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+            PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", _verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_POOL_SIZE, settings.PASSWORD_HASH_QUEUE_SIZE
+)
@@ -0,0 +1,106 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight", "bcrypt operations admitted to the hashing pool"
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth", "bcrypt operations waiting for a pool thread"
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "bcrypt latency including queue wait",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "bcrypt operations rejected because the pool was saturated",
+    ["operation"],
+)
+
+TOKEN_CACHE_HITS = Counter("token_cache_hits_total", "Verified JWT cache hits")
+TOKEN_CACHE_MISSES = Counter("token_cache_misses_total", "Verified JWT cache misses")
+TOKEN_CACHE_ENTRIES = Gauge("token_cache_entries", "Verified JWTs currently cached")
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["database"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["database"]
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_checked_in", "Idle connections held by the pool", ["database"]
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened beyond pool_size", ["database"]
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection",
+    ["database"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that hit pool_timeout", ["database"]
+)
+
+TOKEN_CLEANUP_DELETED = Counter(
+    "token_cleanup_deleted_total",
+    "Refresh tokens removed by dropping expired partitions (planner estimate)",
+)
+TOKEN_CLEANUP_SECONDS = Histogram(
+    "token_cleanup_seconds",
+    "Duration of one refresh-token cleanup run",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+TOKEN_CLEANUP_LAST_DELETED = Gauge(
+    "token_cleanup_last_deleted", "Rows removed by the most recent cleanup run"
+)
+TOKEN_PARTITIONS = Gauge(
+    "refresh_token_partitions", "Daily refresh_tokens partitions attached"
+)
+TOKEN_PARTITIONS_DROPPED = Counter(
+    "refresh_token_partitions_dropped_total", "Expired partitions dropped"
+)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests served", ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Request latency until the response body is sent",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being served", ["method", "route"]
+)
+
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_seconds",
+    "Redis round-trip latency",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "redis_command_errors_total", "Redis commands that raised", ["command"]
+)
+
+SCHEDULER_JOB_SECONDS = Histogram(
+    "scheduler_job_seconds",
+    "Duration of scheduled job runs",
+    ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+SCHEDULER_JOB_FAILURES = Counter(
+    "scheduler_job_failures_total", "Scheduled job runs that raised", ["job"]
+)
+
+EMAIL_OUTCOMES = Counter(
+    "email_outcomes_total",
+    "Outbox delivery attempts by outcome (sent, retry, failed)",
+    ["outcome"],
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "email_send_seconds",
+    "SMTP send latency, including a reconnect",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
@@ -0,0 +1,145 @@
+import logging
+import re
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
+from src.database.db import track_queries
+
+logger = logging.getLogger("uvicorn.error")
+
+UNMATCHED = "unmatched"
+METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"}
+)
+
+
+class RouteTemplates:
+    """Maps a request to the path template of the route that serves it,
+    e.g. ``/api/v1/todos/{todo_id}``; labelling by template keeps the series
+    count bounded whatever ids clients send.
+
+    Only the compiled path regexes are checked, which is a fraction of the
+    cost of calling every route's ``matches`` ahead of the router.
+    """
+
+    def __init__(self, routes: list):
+        self._routes: list[tuple[re.Pattern, frozenset | None, str]] = [
+            (
+                route.path_regex,
+                frozenset(route.methods) if getattr(route, "methods", None) else None,
+                route.path,
+            )
+            for route in routes
+            if hasattr(route, "path_regex")
+        ]
+
+    def match(self, method: str, path: str) -> str:
+        for regex, methods, template in self._routes:
+            if (methods is None or method in methods) and regex.match(path):
+                return template
+        return UNMATCHED
+
+
+class PrometheusMiddleware:
+    """Counts, times and tracks in-flight HTTP requests per route template.
+
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so it adds no
+    extra task or body buffering to each request. The route table is read
+    on the first request, once every router has been included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: RouteTemplates | None = None
+        self._series: dict[tuple[str, str], tuple] = {}
+        self._counters: dict[tuple[str, str, int], object] = {}
+
+    def _series_for(self, method: str, route: str) -> tuple:
+        series = self._series.get((method, route))
+        if series is None:
+            series = (
+                HTTP_REQUESTS_IN_FLIGHT.labels(method, route),
+                HTTP_REQUEST_SECONDS.labels(method, route),
+            )
+            self._series[(method, route)] = series
+        return series
+
+    def _counter_for(self, method: str, route: str, status_code: int):
+        counter = self._counters.get((method, route, status_code))
+        if counter is None:
+            counter = HTTP_REQUESTS.labels(method, route, str(status_code))
+            self._counters[(method, route, status_code)] = counter
+        return counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self._templates is None:
+            self._templates = RouteTemplates(scope["app"].router.routes)
+
+        method = scope["method"] if scope["method"] in METHODS else "OTHER"
+        route = self._templates.match(method, scope["path"])
+        in_flight, latency = self._series_for(method, route)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency.observe(time.perf_counter() - start)
+            self._counter_for(method, route, status_code).inc()
+            in_flight.dec()
+
+
+class QueryStatsMiddleware:
+    """Counts the SQL statements each request issues and the time spent on
+    them, optionally reporting both in a ``Server-Timing`` header, and warns
+    about SELECTs repeated ``repeated_threshold`` times (likely N+1).
+
+    Statements run after the response has started, e.g. while streaming an
+    export, are not in the header but are checked for repeats.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool, repeated_threshold: int):
+        self.app = app
+        self.server_timing = server_timing
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if self.server_timing and message["type"] == "http.response.start":
+                    duration = stats.seconds * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={duration:.2f};desc="{stats.count} queries"',
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        for statement, count in stats.repeated(self.repeated_threshold):
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"{count} x {statement}"
+            )
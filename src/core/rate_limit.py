@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Callable
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.core.cache import TTLCache
+from src.database.redis_db import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+# GCRA: the key holds the theoretical arrival time (TAT) of the next request
+# in ms. Redis' own clock is used so every worker agrees on "now".
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+  tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+if allow_at > now then
+  return {0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+
+
+class RateLimiter:
+    """Shared GCRA limiter (a token bucket of ``limit`` per ``period``).
+
+    Decisions are made atomically in Redis by a Lua script. If Redis errors
+    or does not answer within ``redis_timeout`` the same algorithm runs on a
+    per-process table, so limits keep applying, per worker, during an outage.
+    """
+
+    def __init__(self, redis_timeout: float, local_size: int):
+        self.redis_timeout = redis_timeout
+        self._script = redis_client.register_script(GCRA_SCRIPT)
+        self._local = TTLCache(local_size, ttl=0)
+
+    @staticmethod
+    def _interval_ms(limit: int, period: float) -> int:
+        return max(1, int(period * 1000 / limit))
+
+    def _hit_local(self, key: str, interval: int, burst: int) -> int:
+        now = int(time.monotonic() * 1000)
+        tat = max(self._local.get(key) or now, now)
+        new_tat = tat + interval
+        allow_at = new_tat - burst * interval
+        if allow_at > now:
+            return allow_at - now
+        self._local.set(key, new_tat, ttl=(new_tat - now) / 1000)
+        return 0
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        """Count one request against ``key``; returns 0 if it is allowed,
+        otherwise the seconds until it would be."""
+        interval = self._interval_ms(limit, period)
+        try:
+            allowed, retry_ms = await asyncio.wait_for(
+                self._script(keys=[key], args=[interval, limit]), self.redis_timeout
+            )
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Rate limiter using local fallback: {e}")
+            retry_ms = self._hit_local(key, interval, limit)
+        return retry_ms / 1000
+
+    async def check(self, scope: str, identity: str, limit: int, period: float):
+        if not settings.RATE_LIMIT_ENABLED or limit <= 0:
+            return
+        retry_after = await self.hit(f"rl:{scope}:{identity}", limit, period)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+rate_limiter = RateLimiter(
+    settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS, settings.RATE_LIMIT_LOCAL_SIZE
+)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(scope: str, limit: int, period: float | None = None) -> Callable:
+    """Dependency limiting ``scope`` to ``limit`` requests per client IP."""
+
+    async def dependency(request: Request) -> None:
+        await rate_limiter.check(
+            scope,
+            client_ip(request),
+            limit,
+            period or settings.RATE_LIMIT_PERIOD_SECONDS,
+        )
+
+    return dependency
+
+
+async def limit_login_by_username(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> None:
+    """Per-account limit on password attempts, whatever IPs they come from."""
+    await rate_limiter.check(
+        "login:user",
+        form_data.username.lower(),
+        settings.RATE_LIMIT_LOGIN_PER_USERNAME,
+        settings.RATE_LIMIT_PERIOD_SECONDS,
+    )
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic_core import to_json
+from sqlalchemy import Row
+
+
+def _jsonable(content: Any) -> Any:
+    if isinstance(content, Row):
+        return content._asdict()
+    if isinstance(content, (list, tuple)):
+        return [_jsonable(item) for item in content]
+    if isinstance(content, dict):
+        return {key: _jsonable(value) for key, value in content.items()}
+    return content
+
+
+class RowJSONResponse(Response):
+    """Serialises SQLAlchemy rows straight to JSON, skipping response_model
+    validation. Use it only for projections that already match the schema."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return to_json(_jsonable(content))
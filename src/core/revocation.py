@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import logging
+import math
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.core.token_cache import token_digest
+from src.database.redis_db import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class RevocationFilter:
+    """Per-worker Bloom filter of revoked access token IDs.
+
+    Only possible hits are confirmed against the ``bl:{token}`` keys in Redis.
+    Until the filter has been loaded while the listener is subscribed every
+    check goes to Redis, since revocations published in the meantime are
+    missed; when Redis is slow or unreachable a filter hit is treated as
+    revoked.
+    """
+
+    CHANNEL = "revoked_tokens"
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        redis_timeout: float,
+        retry_delay: float = 5.0,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.redis_timeout = redis_timeout
+        self.retry_delay = retry_delay
+        self.ready = False
+        self._subscribed = False
+        self._filter = BloomFilter(capacity, error_rate)
+        # one list per load in progress, of tokens added while it scans
+        self._pending: list[list[str]] = []
+        self._loading = asyncio.Lock()
+        self._listener: asyncio.Task | None = None
+
+    def add(self, token_id: str) -> None:
+        self._filter.add(token_id)
+        for pending in self._pending:
+            pending.append(token_id)
+
+    def might_be_revoked(self, token_id: str) -> bool:
+        return token_id in self._filter
+
+    async def publish(self, token: str) -> None:
+        token_id = token_digest(token)
+        self.add(token_id)
+        try:
+            await redis_client.publish(self.CHANNEL, token_id)
+        except RedisError as e:
+            logger.warning(f"Failed to publish token revocation: {e}")
+
+    async def is_revoked(self, token: str) -> bool:
+        token_id = token_digest(token)
+        if self.ready and not self.might_be_revoked(token_id):
+            return False
+        try:
+            return bool(
+                await asyncio.wait_for(
+                    redis_client.exists(f"bl:{token}"), self.redis_timeout
+                )
+            )
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Blacklist lookup failed, using local filter: {e}")
+            return self.might_be_revoked(token_id)
+
+    async def load(self) -> None:
+        """Rebuild the filter from the blacklist, shedding expired tokens.
+
+        The filter is only trusted (``ready``) if the listener is subscribed,
+        otherwise revocations published after the scan would never reach it.
+        """
+        async with self._loading:
+            pending: list[str] = []
+            self._pending.append(pending)
+            try:
+                fresh = BloomFilter(self.capacity, self.error_rate)
+                count = 0
+                async for key in redis_client.scan_iter(match="bl:*", count=1000):
+                    fresh.add(token_digest(key[3:].decode()))
+                    count += 1
+                for token_id in pending:
+                    fresh.add(token_id)
+                self._filter = fresh
+                self.ready = self._subscribed
+                logger.info(f"Revocation filter loaded with {count} tokens")
+            finally:
+                self._pending.remove(pending)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                self._subscribed = True
+                await self.load()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.add(message["data"].decode())
+            except (RedisError, OSError) as e:
+                self._subscribed = False
+                self.ready = False
+                logger.warning(f"Revocation listener disconnected: {e}")
+                await asyncio.sleep(self.retry_delay)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._subscribed = False
+        self.ready = False
+
+
+revocation_filter = RevocationFilter(
+    settings.REVOCATION_FILTER_CAPACITY,
+    settings.REVOCATION_FILTER_ERROR_RATE,
+    settings.REVOCATION_REDIS_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,49 @@
+import hashlib
+import time
+
+import jwt
+
+from src.conf.config import settings
+from src.core.cache import TTLCache
+from src.core.metrics import TOKEN_CACHE_ENTRIES, TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """Caches payloads of verified JWTs by token digest until their ``exp``.
+
+    Revocation is not tracked here: callers check the blacklist first and
+    evict revoked tokens with ``invalidate``.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize, ttl=0)
+
+    def decode(self, token: str) -> dict:
+        key = token_digest(token)
+        payload = self._cache.get(key)
+        if payload is not None:
+            TOKEN_CACHE_HITS.inc()
+            return dict(payload)
+        TOKEN_CACHE_MISSES.inc()
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            self._cache.set(key, payload, ttl=exp - time.time())
+        return dict(payload)
+
+    def invalidate(self, token: str) -> None:
+        self._cache.pop(token_digest(token))
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+TOKEN_CACHE_ENTRIES.set_function(lambda: len(verified_tokens))
@@ -1,26 +1,260 @@
+import asyncio
+import collections
 import contextlib
+import itertools
 import logging
+import time
+from contextvars import ContextVar
 
-from sqlalchemy.exc import SQLAlchemyError
+import jwt
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.conf.config import settings
+from src.core.cache import TTLCache
+from src.core.metrics import (
+    DB_POOL_CHECKED_IN,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+)
+from src.core.token_cache import verified_tokens
+from src.database.redis_db import redis_client
 
 logger = logging.getLogger("uvicorn.error")
 
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited."""
+
+    name = "primary"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.name).observe(
+                time.perf_counter() - start
+            )
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.name = self.name
+        return pool
+
+
+class QueryStats:
+    """Statements issued and time spent in the database within one scope,
+    usually a request. Scopes nest: a statement counts towards every
+    enclosing scope."""
+
+    def __init__(self, parent: "QueryStats | None" = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: collections.Counter[str] = collections.Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """SELECTs run at least ``threshold`` times, the usual trace of a
+        lazy load or query inside a loop (N+1). Repeated writes are left out:
+        batched inserts repeat on purpose."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= threshold and statement.lstrip()[:6].upper() == "SELECT"
+        ]
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextlib.contextmanager
+def track_queries():
+    """Collect the statements executed by the current task into a new
+    ``QueryStats`` scope."""
+    stats = QueryStats(_query_stats.get())
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextlib.contextmanager
+def assert_max_queries(limit: int):
+    """Test helper failing when the block issues more than ``limit`` statements.
+
+    Tracking follows the context, so the app has to run in the caller's task,
+    e.g. through ``httpx.AsyncClient(transport=httpx.ASGITransport(app))``::
+
+        with assert_max_queries(2):
+            await client.get("/api/v1/users/me", headers=auth)
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(
+            f"{count} x {statement}"
+            for statement, count in stats.statements.most_common()
+        )
+        raise AssertionError(
+            f"{stats.count} queries issued, expected at most {limit}:\n{listing}"
+        )
+
+
+def _shape(value) -> str:
+    if isinstance(value, (list, tuple)) and not isinstance(value, str):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    """Types, never values, of a statement's parameters for logging."""
+    if executemany:
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {parameters_shape(first)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_shape(v)}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_shape(v) for v in parameters) + ")"
+    return _shape(parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms, "
+            f"params {parameters_shape(parameters, executemany)}): {statement}"
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def build_engine(url: str, name: str) -> AsyncEngine:
+    connect_args = {}
+    if make_url(url).drivername.endswith("+asyncpg"):
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    engine.sync_engine.pool.name = name
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+    def pool():
+        return engine.sync_engine.pool
+
+    DB_POOL_SIZE.labels(name).set_function(lambda: pool().size())
+    DB_POOL_CHECKED_OUT.labels(name).set_function(lambda: pool().checkedout())
+    DB_POOL_CHECKED_IN.labels(name).set_function(lambda: pool().checkedin())
+    DB_POOL_OVERFLOW.labels(name).set_function(lambda: max(0, pool().overflow()))
+    return engine
+
+
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
-        self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+    def __init__(self, url: str, replica_urls: list[str] | None = None):
+        self._engine: AsyncEngine | None = build_engine(url, "primary")
+        self._session_maker: async_sessionmaker = self._build_session_maker(
+            self._engine
+        )
+        self._replica_engines: list[AsyncEngine] = [
+            build_engine(replica_url, f"replica{i}")
+            for i, replica_url in enumerate(replica_urls or [])
+        ]
+        self._replica_session_makers = itertools.cycle(
+            [self._build_session_maker(engine) for engine in self._replica_engines]
         )
 
+    @staticmethod
+    def _build_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+            bind=engine,
+        )
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replica_engines)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        primary = [self._engine] if self._engine is not None else []
+        return primary + self._replica_engines
+
+    async def warmup(self, connections: int) -> None:
+        """Open up to ``connections`` pooled connections per engine ahead of
+        traffic."""
+        connections = min(connections, settings.DB_POOL_SIZE)
+        if connections <= 0:
+            return
+        for engine in self.engines:
+            results = await asyncio.gather(
+                *(engine.connect().start() for _ in range(connections)),
+                return_exceptions=True,
+            )
+            opened = [conn for conn in results if not isinstance(conn, BaseException)]
+            await asyncio.gather(*(conn.close() for conn in opened))
+            if len(opened) < connections:
+                logger.warning(
+                    f"Database pool warmup opened {len(opened)}/{connections} "
+                    f"connections for {engine.sync_engine.pool.name}"
+                )
+
+    async def close(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
     @contextlib.asynccontextmanager
-    async def session(self):
+    async def session(self, readonly: bool = False):
         if self._session_maker is None:
             raise Exception("Database session is not initialized")
-        session = self._session_maker()
+        if readonly and self.has_replicas:
+            session = next(self._replica_session_makers)()
+        else:
+            session = self._session_maker()
         try:
             yield session
         except SQLAlchemyError as e:
@@ -35,9 +269,54 @@ class DatabaseSessionManager:
             await session.close()
 
 
-sessionmanager = DatabaseSessionManager(settings.DB_URL)
+sessionmanager = DatabaseSessionManager(settings.DB_URL, settings.DB_REPLICA_URLS)
+
+# Users who wrote recently read from the primary so they see their own writes
+# despite replica lag. Pins are shared through Redis and cached per worker.
+_local_pins = TTLCache(maxsize=10_000, ttl=settings.DB_REPLICA_PIN_SECONDS)
+
+
+async def pin_to_primary(username: str) -> None:
+    if not sessionmanager.has_replicas:
+        return
+    _local_pins.set(username, True)
+    try:
+        await redis_client.set(
+            f"pin:{username}", "1", px=int(settings.DB_REPLICA_PIN_SECONDS * 1000)
+        )
+    except RedisError as e:
+        logger.warning(f"Failed to pin {username} to the primary: {e}")
+
+
+async def is_pinned_to_primary(username: str) -> bool:
+    if _local_pins.get(username):
+        return True
+    try:
+        return bool(await redis_client.exists(f"pin:{username}"))
+    except RedisError:
+        return True
+
+
+async def _request_username(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verified_tokens.decode(token).get("sub")
+    except jwt.PyJWTError:
+        return None
 
 
 async def get_db():
     async with sessionmanager.session() as session:
         yield session
+
+
+async def get_read_db(request: Request):
+    readonly = sessionmanager.has_replicas
+    if readonly:
+        username = await _request_username(request)
+        if username is not None and await is_pinned_to_primary(username):
+            readonly = False
+    async with sessionmanager.session(readonly=readonly) as session:
+        yield session
@@ -0,0 +1,46 @@
+import time
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from src.conf.config import settings
+from src.core.metrics import REDIS_COMMAND_ERRORS, REDIS_COMMAND_SECONDS
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline timed as a single round trip when it is executed."""
+
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels("PIPELINE").inc()
+            raise
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records the latency of every command by name."""
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels(command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_SECONDS.labels(command).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+redis_client = InstrumentedRedis.from_url(settings.REDIS_URL)
@@ -9,15 +9,25 @@ from sqlalchemy import (
     Text,
     Enum as SqlaEnum,
     Boolean,
+    Index,
+    Computed,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, relationship
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.conf import containts
 
+TODO_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch generated defaults through INSERT/UPDATE ... RETURNING instead of
+    # a follow-up refresh() SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class Todo(Base):
@@ -34,7 +44,57 @@ class Todo(Base):
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)
-    user: Mapped["User"] = relationship("User", backref="todos", lazy="joined")
+    # Load with options(joinedload(Todo.user)) where the owner is needed.
+    user: Mapped["User"] = relationship("User", backref="todos", lazy="select")
+
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(TODO_SEARCH_VECTOR, persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+
+    __table_args__ = (
+        Index("ix_todos_user_id_id", "user_id", "id"),
+        # (user_id, search_vector) in one GIN index needs the btree_gin extension.
+        Index(
+            "ix_todos_user_id_search_vector",
+            "user_id",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        # Listing filters/sorts: see TodosController.get_todos.
+        Index(
+            "ix_todos_user_id_completed_created_at",
+            "user_id",
+            "completed",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        Index("ix_todos_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_todos_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        Index(
+            "ix_todos_user_id_updated_at_id_open",
+            "user_id",
+            "updated_at",
+            "id",
+            postgresql_where=text("NOT completed"),
+        ),
+    )
+
+
+class TodoStats(Base):
+    """Per-user todo counters, kept in step with todos by TodosController."""
+
+    __tablename__ = "todo_stats"
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total: Mapped[int] = mapped_column(nullable=False, default=0)
+    completed: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), onupdate=func.now()
+    )
 
 
 class UserRole(str, Enum):
@@ -53,6 +113,8 @@ class User(Base):
         SqlaEnum(UserRole), default=UserRole.USER, nullable=False
     )
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
+    # sha256 of the uploaded file behind ``avatar``, to skip re-uploads
+    avatar_hash: Mapped[str] = mapped_column(String(64), nullable=True)
     confirmed: Mapped[bool] = mapped_column(Boolean, default=False)
 
     refresh_tokens: Mapped[list["RefreshToken"]] = relationship(
@@ -61,18 +123,60 @@ class User(Base):
 
 
 class RefreshToken(Base):
+    """Range-partitioned by day on expires_at; expired days are dropped whole.
+
+    A unique index on a partitioned table must include the partition key, so
+    token_hash is only indexed, not unique. Hashes of 256-bit random tokens
+    do not collide in practice, and lookups add ``expires_at > now()`` so
+    only live partitions are probed.
+    """
+
     __tablename__ = "refresh_tokens"
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    token_hash: Mapped[str] = mapped_column(nullable=False, unique=True)
+    token_hash: Mapped[str] = mapped_column(nullable=False, index=True)
+    # Every token rotated from the same login shares a family.
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now()
     )
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), primary_key=True
     )
     revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     ip_address: Mapped[str] = mapped_column(String(50), nullable=True)
     user_agent: Mapped[str] = mapped_column(Text, nullable=True)
 
     user: Mapped["User"] = relationship("User", back_populates="refresh_tokens")
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (expires_at)"}
+
+
+class EmailOutbox(Base):
+    """Outgoing mail, written in the transaction that produces it and
+    delivered by EmailDispatcher."""
+
+    __tablename__ = "email_outbox"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    template: Mapped[str] = mapped_column(String(100), nullable=False)
+    context: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String(10), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
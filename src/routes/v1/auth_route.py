@@ -1,15 +1,17 @@
 import logging
 
 
-from fastapi import APIRouter, Depends, Request, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.conf.config import settings
+from src.core.rate_limit import limit_by_ip, limit_login_by_username
 from src.database.db import get_db
 from src.schemas.token_schemas import TokenResponse, RefreshTokenRequest
 from src.services.auth_service import AuthService, oauth2_scheme
 from src.schemas.user_schemas import UserCreate, UserResponse
-from src.services.service_email import send_email
+from src.services.email_outbox_service import email_dispatcher
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -20,21 +22,31 @@ def get_auth_service(db: AsyncSession = Depends(get_db)):
     return AuthService(db)
 
 
-@router.post("/register", response_model=UserResponse)
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    dependencies=[
+        Depends(limit_by_ip("register", settings.RATE_LIMIT_REGISTER_PER_IP))
+    ],
+)
 async def register(
     user_data: UserCreate,
-    background_tasks: BackgroundTasks,
     request: Request,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    user = await auth_service.register_user(user_data)
-    background_tasks.add_task(
-        send_email, user_data.email, user.username, str(request.base_url)
-    )
+    user = await auth_service.register_user(user_data, str(request.base_url))
+    email_dispatcher.wake()
     return user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[
+        Depends(limit_by_ip("login", settings.RATE_LIMIT_LOGIN_PER_IP)),
+        Depends(limit_login_by_username),
+    ],
+)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     request: Request = None,
@@ -52,23 +64,22 @@ async def login(
     )
 
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(limit_by_ip("refresh", settings.RATE_LIMIT_REFRESH_PER_IP))],
+)
 async def refresh_token(
     refresh_token_data: RefreshTokenRequest,
     request: Request = None,
     auth_service: AuthService = Depends(get_auth_service),
 ):
-    user = await auth_service.validate_refresh_token(refresh_token_data.refresh_token)
-
-    access_token = auth_service.create_access_token(user.username)
-    refresh_token = await auth_service.create_refresh_token(
-        user.id,
+    username, refresh_token = await auth_service.rotate_refresh_token(
+        refresh_token_data.refresh_token,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("user-agent") if request else None,
     )
-
-    await auth_service.revoke_refresh_token(refresh_token_data.refresh_token)
-
+    access_token = auth_service.create_access_token(username)
     return TokenResponse(
         access_token=access_token, refresh_token=refresh_token, token_type="bearer"
     )
@@ -1,42 +1,167 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.depend_service import get_current_user
-from src.database.db import get_db
-from src.services.todos_services import TodosServices
+from src.core.etag import etag_matches
+from src.core.responses import RowJSONResponse
+from src.database.db import get_db, get_read_db
+from src.services.import_service import TodoImportService
+from src.services.todos_services import (
+    TodosServices,
+    TodoFileFormat,
+    stream_todos_export,
+)
 from src.models.models import User
 from src.schemas.todo_schemas import (
     TodoSchema,
     TodoSchemaUpdate,
     TodoResponse,
     TodoUpdateStatusSchema,
+    TodoCursorPage,
+    TodoBulkCreateSchema,
+    TodoBulkStatusSchema,
+    TodoBulkDeleteSchema,
+    TodoBulkResult,
+    TodoImportReport,
+    TodoSearchPage,
+    TodoFilterParams,
+    TodoStatsResponse,
 )
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 logger = logging.getLogger("uvicorn.error")
 
 
-@router.get("/", response_model=list[TodoResponse])
+def _conditional_headers(etag: str | None) -> dict[str, str]:
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+@router.get("/", response_model=list[TodoResponse] | TodoCursorPage)
 async def get_todos(
+    request: Request,
     limit: int = Query(10, ge=0, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor from a previous page; pass an empty value to "
+        "start cursor pagination. Offset mode is kept for backward compatibility.",
+    ),
+    filters: TodoFilterParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    todo_services = TodosServices(db)
+    # The version is read before any SQL, so a 304 costs one Redis GET.
+    etag = await todo_services.get_todos_etag(request.query_params.multi_items(), user)
+    headers = _conditional_headers(etag)
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if cursor is not None:
+        page = await todo_services.get_todos_page(limit, cursor, user, filters)
+        return RowJSONResponse(page, headers=headers)
+    todos = await todo_services.get_todos(limit, offset, user, filters)
+    return RowJSONResponse(todos, headers=headers)
+
+
+@router.get("/search", response_model=TodoSearchPage)
+async def search_todos(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str = Query("", description="Opaque cursor from a previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    todo_services = TodosServices(db)
+    return RowJSONResponse(await todo_services.search_todos(q, limit, cursor, user))
+
+
+@router.get("/stats", response_model=TodoStatsResponse)
+async def get_todo_stats(
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    todo_services = TodosServices(db)
+    return await todo_services.get_todo_stats(user)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_todos(
+    export_format: TodoFileFormat = Query("ndjson", alias="format"),
+    user: User = Depends(get_current_user),
+):
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_todos_export(user.id, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="todos.{export_format}"'
+        },
+    )
+
+
+@router.post("/import", response_model=TodoImportReport)
+async def import_todos(
+    request: Request,
+    import_format: TodoFileFormat = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    import_service = TodoImportService(db)
+    return await import_service.import_todos(user.id, request.stream(), import_format)
+
+
+@router.post(
+    "/bulk",
+    response_model=list[TodoBulkResult],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_todos(
+    body: TodoBulkCreateSchema,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    todo_services = TodosServices(db)
+    return await todo_services.create_todos(body.items, user)
+
+
+@router.patch("/bulk", response_model=list[TodoBulkResult])
+async def update_todos_status(
+    body: TodoBulkStatusSchema,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    todo_services = TodosServices(db)
+    return await todo_services.update_todos_status(body.items, user)
+
+
+@router.delete("/bulk", response_model=list[TodoBulkResult])
+async def delete_todos(
+    body: TodoBulkDeleteSchema,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     todo_services = TodosServices(db)
-    return await todo_services.get_todos(limit, offset, user)
+    return await todo_services.remove_todos(body.ids, user)
 
 
 @router.get("/{todo_id}", response_model=TodoResponse)
 async def get_todo(
     todo_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     todo_services = TodosServices(db)
-    return await todo_services.get_todo_by_id(todo_id, user)
+    todo = await todo_services.get_todo_by_id(todo_id, user)
+    headers = _conditional_headers(todo_services.get_todo_etag(todo))
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return RowJSONResponse(todo, headers=headers)
 
 
 @router.post("/", response_model=TodoResponse, status_code=status.HTTP_201_CREATED)
@@ -4,17 +4,15 @@ from fastapi import (
     status,
     Request,
     HTTPException,
-    BackgroundTasks,
     UploadFile,
     File,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from src.conf.config import settings
 from src.core.email_token import get_email_from_token
-from src.database.db import get_db
+from src.core.rate_limit import limit_by_ip
+from src.database.db import get_read_db
 from src.schemas.schema_email import RequestEmailSchema
 from src.schemas.user_schemas import UserResponse
 from src.services.auth_service import AuthService, oauth2_scheme
@@ -22,26 +20,30 @@ from src.models.models import User
 from src.core.depend_service import (
     get_current_admin,
     get_current_moderator,
+    get_current_user as get_authenticated_user,
     get_user_service,
+    get_avatar_service,
 )
-from src.services.service_email import send_email
+from src.services.email_outbox_service import email_dispatcher
 from src.services.user_sevice import UserService
-from src.services.upload_file_service import UploadFileService
+from src.services.avatar_service import AvatarService
 
 router = APIRouter(prefix="/users", tags=["users"])
-limiter = Limiter(key_func=get_remote_address)
 
 
-def get_auth_service(db: AsyncSession = Depends(get_db)):
+def get_read_auth_service(db: AsyncSession = Depends(get_read_db)):
     return AuthService(db)
 
 
-@router.get("/me", status_code=status.HTTP_200_OK, response_model=UserResponse)
-@limiter.limit("10/minute")
+@router.get(
+    "/me",
+    status_code=status.HTTP_200_OK,
+    response_model=UserResponse,
+    dependencies=[Depends(limit_by_ip("me", settings.RATE_LIMIT_ME_PER_IP))],
+)
 async def get_current_user(
-    request: Request,
     token: str = Depends(oauth2_scheme),
-    auth_service: AuthService = Depends(get_auth_service),
+    auth_service: AuthService = Depends(get_read_auth_service),
 ):
     return await auth_service.get_current_user(token)
 
@@ -68,7 +70,6 @@ async def confirm_email(
 @router.post("/request_email")
 async def request_email(
     body: RequestEmailSchema,
-    background_tasks: BackgroundTasks,
     request: Request,
     user_service: UserService = Depends(get_user_service),
 ):
@@ -77,9 +78,8 @@ async def request_email(
     if user.confirmed:
         return {"message": "Email already confirmed"}
     if user:
-        background_tasks.add_task(
-            send_email, user.email, user.username, str(request.base_url)
-        )
+        await user_service.request_verification_email(user, str(request.base_url))
+        email_dispatcher.wake()
 
     return {"message": "Email sent"}
 
@@ -87,16 +87,10 @@ async def request_email(
 @router.patch("/avatar", response_model=UserResponse)
 async def update_avatar(
     file: UploadFile = File(),
-    user: User = Depends(get_current_user),
-    user_service: UserService = Depends(get_user_service),
+    user: User = Depends(get_authenticated_user),
+    avatar_service: AvatarService = Depends(get_avatar_service),
 ):
-    avatar_url = UploadFileService(
-        settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
-    ).upload_file(file, user.username)
-
-    user = await user_service.update_avatar_url(user.email, avatar_url)
-
-    return user
+    return await avatar_service.update_avatar(user, file)
 
 
 @router.get("/moderator")
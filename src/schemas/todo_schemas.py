@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from src.conf import containts
 from src.conf import messages
@@ -33,6 +33,30 @@ class TodoUpdateStatusSchema(BaseModel):
     completed: bool
 
 
+TodoSortKey = Literal["id", "created_at", "updated_at", "title"]
+TodoSortOrder = Literal["asc", "desc"]
+
+
+class TodoFilterParams(BaseModel):
+    completed: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    sort: TodoSortKey = "id"
+    order: TodoSortOrder = "asc"
+
+    @field_validator(
+        "created_after", "created_before", "updated_after", "updated_before"
+    )
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # created_at/updated_at are stored as naive UTC timestamps
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
 class TodoResponse(BaseModel):
     id: int
     title: str
@@ -42,3 +66,58 @@ class TodoResponse(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TodoCursorPage(BaseModel):
+    items: list[TodoResponse]
+    next_cursor: Optional[str] = None
+
+
+class TodoStatsResponse(BaseModel):
+    total: int
+    completed: int
+    open: int
+
+
+class TodoSearchResult(TodoResponse):
+    rank: float
+
+
+class TodoSearchPage(BaseModel):
+    items: list[TodoSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class TodoBulkCreateSchema(BaseModel):
+    items: list[TodoSchema] = Field(min_length=1, max_length=containts.BULK_MAX_ITEMS)
+
+
+class TodoBulkStatusItem(TodoUpdateStatusSchema):
+    id: int
+
+
+class TodoBulkStatusSchema(BaseModel):
+    items: list[TodoBulkStatusItem] = Field(
+        min_length=1, max_length=containts.BULK_MAX_ITEMS
+    )
+
+
+class TodoBulkDeleteSchema(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=containts.BULK_MAX_ITEMS)
+
+
+class TodoBulkResult(BaseModel):
+    id: int
+    status: Literal["created", "updated", "deleted", "not_found"]
+    todo: Optional[TodoResponse] = None
+
+
+class TodoImportError(BaseModel):
+    line: int
+    error: str
+
+
+class TodoImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[TodoImportError] = []
@@ -9,3 +9,10 @@ class TokenResponse(BaseModel):
 
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
+
+
+class TokenCleanupReport(BaseModel):
+    deleted: int = 0
+    partitions_created: int = 0
+    partitions_dropped: int = 0
+    duration_seconds: float = 0.0
@@ -21,3 +21,13 @@ class UserResponse(UserSchema):
     avatar: str | None
     role: UserRole
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserSnapshot(BaseModel):
+    id: int
+    username: str
+    email: str
+    role: UserRole
+    avatar: str | None = None
+    confirmed: bool
+    model_config = ConfigDict(from_attributes=True, frozen=True)
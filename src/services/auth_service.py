@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta, timezone
+import logging
 import secrets
+import uuid
 
 import jwt
-import bcrypt
 import hashlib
-import redis.asyncio as redis
 from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
@@ -14,12 +14,17 @@ from libgravatar import Gravatar
 from src.conf.config import settings
 from src.controllers.refresh_token_controllers import RefreshTokenController
 from src.controllers.user_controllers import UsersController
+from src.core.hashing import password_hasher
+from src.core.revocation import revocation_filter
+from src.core.token_cache import verified_tokens
+from src.database.redis_db import redis_client
 from src.models.models import User
-from src.schemas.user_schemas import UserCreate
+from src.schemas.user_schemas import UserCreate, UserSnapshot
+from src.services.service_email import enqueue_verification_email
+from src.services.user_cache import user_cache
 
-
-redis_client = redis.from_url(settings.REDIS_URL)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+logger = logging.getLogger("uvicorn.error")
 
 
 class AuthService:
@@ -28,13 +33,11 @@ class AuthService:
         self.user_controller = UsersController(self.db)
         self.refresh_token_controller = RefreshTokenController(self.db)
 
-    def _hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed_password.decode("utf-8")
+    async def _hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
     def _hash_token(self, token: str) -> str:
         return hashlib.sha256(token.encode()).hexdigest()
@@ -51,7 +54,7 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User is not confirmed",
             )
-        if not self._verify_password(password, user.hash_password):
+        if not await self._verify_password(password, user.hash_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password",
@@ -59,7 +62,7 @@ class AuthService:
 
         return user
 
-    async def register_user(self, user_data: UserCreate) -> User:
+    async def register_user(self, user_data: UserCreate, host: str) -> User:
         checked_user = await self.user_controller.get_by_username(user_data.username)
         if checked_user is not None:
             raise HTTPException(
@@ -78,7 +81,12 @@ class AuthService:
         except Exception as e:
             print(e)
 
-        hashed_password = self._hash_password(user_data.password)
+        hashed_password = await self._hash_password(user_data.password)
+        # create_user commits, so the user and its confirmation mail land
+        # together or not at all.
+        enqueue_verification_email(
+            self.db, str(user_data.email), user_data.username, host
+        )
         user = await self.user_controller.create_user(
             user_data, hashed_password, avatar
         )
@@ -94,34 +102,59 @@ class AuthService:
         )
         return encoded_jwt
 
+    def _refresh_token_expiry(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(
+            days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+
     async def create_refresh_token(
         self, user_id: int, ip_address: str | None, user_agent: str | None
     ) -> str:
         token = secrets.token_urlsafe(32)
         token_hash = self._hash_token(token)
-        expired_at = datetime.now(timezone.utc) + timedelta(
-            days=settings.REFRESH_TOKEN_EXPIRE_DAYS
-        )
         await self.refresh_token_controller.create_token(
-            user_id, token_hash, expired_at, ip_address, user_agent
+            user_id,
+            token_hash,
+            uuid.uuid4().hex,
+            self._refresh_token_expiry(),
+            ip_address,
+            user_agent,
         )
         return token
 
+    async def rotate_refresh_token(
+        self, token: str, ip_address: str | None, user_agent: str | None
+    ) -> tuple[str, str]:
+        """Swap a refresh token for a new one; returns (username, new token)."""
+        new_token = secrets.token_urlsafe(32)
+        consumed = await self.refresh_token_controller.rotate_token(
+            self._hash_token(token),
+            self._hash_token(new_token),
+            self._refresh_token_expiry(),
+            ip_address,
+            user_agent,
+        )
+        if consumed is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+            )
+        return consumed.username, new_token
+
     def decode_and_verify_access_token(self, token: str) -> dict:
         try:
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-            )
-            return payload
+            return verified_tokens.decode(token)
         except jwt.PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token wrong",
             )
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme)) -> User:
+    async def get_current_user(
+        self, token: str = Depends(oauth2_scheme)
+    ) -> UserSnapshot:
 
-        if await redis_client.exists(f"bl:{token}"):
+        if await revocation_filter.is_revoked(token):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token revoked",
@@ -134,41 +167,22 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
             )
-        user = await self.user_controller.get_by_username(username=username)
-        if user is None:
+        user = await user_cache.get(username)
+        if user is not None:
+            return user
+        generation = await user_cache.generation(username)
+        db_user = await self.user_controller.get_by_username(username=username)
+        if db_user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
             )
-        return user
-
-    async def validate_refresh_token(self, token: str) -> User:
-        token_hash = self._hash_token(token)
-        current_time = datetime.now(timezone.utc)
-        refresh_token = await self.refresh_token_controller.get_active_token(
-            token_hash, current_time
-        )
-        if refresh_token is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-            )
-        user = await self.user_controller.get_by_id(refresh_token.user_id)
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-            )
+        user = UserSnapshot.model_validate(db_user)
+        await user_cache.set(user, generation)
         return user
 
     async def revoke_refresh_token(self, token: str) -> None:
-        token_hash = self._hash_token(token)
-        refresh_token = await self.refresh_token_controller.get_by_token_hash(
-            token_hash
-        )
-        if refresh_token and not refresh_token.revoked_at:
-            await self.refresh_token_controller.revoke_token(refresh_token)
-        return None
+        await self.refresh_token_controller.revoke_token(self._hash_token(token))
 
     async def revoke_access_token(self, token: str) -> None:
         payload = self.decode_and_verify_access_token(token)
@@ -177,3 +191,5 @@ class AuthService:
             await redis_client.setex(
                 f"bl:{token}", exp - datetime.now(timezone.utc).timestamp(), "1"
             )
+            await revocation_filter.publish(token)
+        verified_tokens.invalidate(token)
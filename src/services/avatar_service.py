@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.models.models import User
+from src.schemas.user_schemas import UserSnapshot
+from src.services.upload_file_service import AvatarStorage
+from src.services.user_sevice import UserService
+
+CHUNK_SIZE = 64 * 1024
+AVATAR_CONTENT_TYPE = "image/webp"
+
+# Pillow releases the GIL while decoding and resampling.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatar"
+)
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read the upload in chunks, failing with 413 as soon as it exceeds
+    ``max_bytes`` instead of buffering whatever the client sends."""
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Avatar is too large",
+        )
+    buffer = bytearray()
+    while chunk := await file.read(CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Avatar is too large",
+            )
+    return bytes(buffer)
+
+
+def normalize_avatar(data: bytes, size: int) -> bytes:
+    """Decode, auto-rotate, crop to a ``size`` square and re-encode as WebP.
+
+    Re-encoding also strips EXIF and anything else embedded in the upload.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=85, method=4)
+    return output.getvalue()
+
+
+class AvatarService:
+    def __init__(self, db: AsyncSession, storage: AvatarStorage):
+        self.user_service = UserService(db)
+        self.storage = storage
+
+    async def update_avatar(self, user: UserSnapshot, file: UploadFile) -> User:
+        data = await read_upload(file, settings.AVATAR_MAX_BYTES)
+        digest = hashlib.sha256(data).hexdigest()
+        current = await self.user_service.get_by_username(user.username)
+        if current is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        if current.avatar_hash == digest:
+            return current
+
+        loop = asyncio.get_running_loop()
+        try:
+            avatar = await loop.run_in_executor(
+                _executor, normalize_avatar, data, settings.AVATAR_SIZE
+            )
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Avatar is not a supported image",
+            )
+        # Content-addressed keys give every new avatar a fresh URL, so
+        # caches in front of the storage never serve the previous one. The
+        # user id, unlike the username, is safe to use as a path segment.
+        key = f"{user.id}/{digest[:16]}"
+        url = await self.storage.save(key, avatar, AVATAR_CONTENT_TYPE)
+        updated = await self.user_service.update_avatar_url(user.email, url, digest)
+        if updated is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        return updated
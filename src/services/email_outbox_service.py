@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import random
+import time
+
+import aiosmtplib
+
+from src.conf.config import settings
+from src.controllers.email_outbox_controllers import EmailOutboxController
+from src.core.metrics import EMAIL_OUTCOMES, EMAIL_SEND_SECONDS
+from src.database.db import sessionmanager
+from src.services.service_email import render_email, smtp_client
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class EmailDispatcher:
+    """Drains email_outbox over one long-lived SMTP connection.
+
+    Messages are leased in batches, sent no faster than ``rate`` per second
+    and retried with exponential backoff until ``max_attempts``. The rate is
+    per dispatcher, and every app worker runs one, so the total send rate is
+    workers x ``rate``.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        interval: float,
+        rate: float,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+        idle_timeout: float,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.min_gap = 1 / rate if rate > 0 else 0.0
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.idle_timeout = idle_timeout
+        # a claimed message must be sent or rescheduled well within its lease
+        self.lease = timedelta(
+            seconds=batch_size * self.min_gap + settings.EMAIL_SMTP_TIMEOUT_SECONDS * 2
+        )
+        self._smtp: aiosmtplib.SMTP | None = None
+        self._last_used = 0.0
+        self._next_send = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        """Skip the rest of the poll interval, e.g. right after an enqueue."""
+        self._wakeup.set()
+
+    def _retry_at(self, attempts: int) -> datetime | None:
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        delay += random.uniform(0, self.retry_base)
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    async def _throttle(self) -> None:
+        now = time.monotonic()
+        if self._next_send > now:
+            await asyncio.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self.min_gap
+
+    async def _connection(self) -> aiosmtplib.SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = smtp_client()
+            await self._smtp.connect()
+        return self._smtp
+
+    async def _send(self, message) -> None:
+        # A pooled connection may have been dropped by the server while
+        # idle; reconnect once before counting it as a failed attempt.
+        for retry in (True, False):
+            smtp = await self._connection()
+            try:
+                await smtp.send_message(message)
+                self._last_used = time.monotonic()
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if not retry:
+                    raise
+
+    async def close(self) -> None:
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                self._smtp.close()
+        self._smtp = None
+
+    async def _fail(
+        self, controller: EmailOutboxController, row, error: Exception
+    ) -> None:
+        # SMTP and network errors are usually transient; anything else (a bad
+        # header, a broken template or context) fails the same way every time.
+        transient = isinstance(error, (aiosmtplib.SMTPException, OSError))
+        retry_at = self._retry_at(row.attempts) if transient else None
+        await controller.mark_failed([(row.id, str(error), retry_at)])
+        if retry_at is not None:
+            EMAIL_OUTCOMES.labels("retry").inc()
+            logger.warning(f"Email {row.id} failed, will retry: {error}")
+        else:
+            EMAIL_OUTCOMES.labels("failed").inc()
+            logger.error(
+                f"Giving up on email {row.id} after {row.attempts} attempts: {error}",
+                exc_info=not transient,
+            )
+
+    async def dispatch_once(self) -> int:
+        """Send one batch; returns how many messages were claimed.
+
+        Each message is marked as soon as it is sent or fails, so an error
+        later in the batch never causes an already sent message to go out
+        again.
+        """
+        async with sessionmanager.session() as db:
+            controller = EmailOutboxController(db)
+            batch = await controller.claim_batch(self.batch_size, self.lease)
+            for row in batch:
+                await self._throttle()
+                try:
+                    message = render_email(
+                        row.recipient, row.subject, row.template, row.context
+                    )
+                    with EMAIL_SEND_SECONDS.time():
+                        await self._send(message)
+                except Exception as e:
+                    await self._fail(controller, row, e)
+                    continue
+                await controller.mark_sent([row.id])
+                EMAIL_OUTCOMES.labels("sent").inc()
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            claimed = 0
+            try:
+                claimed = await self.dispatch_once()
+            except Exception as e:
+                # Keep the dispatcher alive; leased messages become due again
+                # when their lease runs out.
+                logger.error(f"Email dispatch failed: {e}", exc_info=True)
+            if claimed == self.batch_size:
+                continue
+            idle = time.monotonic() - self._last_used
+            if self._smtp is not None and idle > self.idle_timeout:
+                await self.close()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.close()
+
+
+email_dispatcher = EmailDispatcher(
+    settings.EMAIL_DISPATCH_BATCH_SIZE,
+    settings.EMAIL_DISPATCH_INTERVAL_SECONDS,
+    settings.EMAIL_SEND_RATE_PER_SECOND,
+    settings.EMAIL_MAX_ATTEMPTS,
+    settings.EMAIL_RETRY_BASE_SECONDS,
+    settings.EMAIL_RETRY_MAX_SECONDS,
+    settings.EMAIL_SMTP_IDLE_SECONDS,
+)
@@ -0,0 +1,142 @@
+import csv
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf import containts
+from src.controllers.todos_controllers import TodosController
+from src.schemas.todo_schemas import TodoImportError, TodoImportReport, TodoSchema
+from src.services.todo_version_service import bump_todos_version
+from src.services.todos_services import TodoFileFormat
+
+logger = logging.getLogger("uvicorn.error")
+
+ProgressCallback = Callable[[TodoImportReport], Awaitable[None] | None]
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_bytes: int
+) -> AsyncIterator[bytes | None]:
+    """Split a byte stream into lines. A line longer than ``max_bytes`` is
+    dropped as it streams in, never buffered whole, and yielded as None."""
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping or len(line) > max_bytes:
+                skipping = False
+                yield None
+            else:
+                yield line.rstrip(b"\r")
+        if len(buffer) > max_bytes:
+            buffer = b""
+            skipping = True
+    if skipping:
+        yield None
+    elif buffer:
+        yield buffer.rstrip(b"\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], import_format: TodoFileFormat
+) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield ``(line number, record)`` pairs, or ``(line number, error)`` for
+    lines that cannot be parsed. CSV input must start with a header row and
+    must not contain quoted newlines."""
+    header = None
+    line_no = 0
+    async for raw in iter_lines(chunks, containts.IMPORT_MAX_LINE_BYTES):
+        line_no += 1
+        if raw is None:
+            yield line_no, f"line longer than {containts.IMPORT_MAX_LINE_BYTES} bytes"
+            continue
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            yield line_no, f"invalid UTF-8 at byte {e.start}: {e.reason}"
+            continue
+        if not line.strip():
+            continue
+        if import_format == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            if len(values) != len(header):
+                yield line_no, f"expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, dict(zip(header, values))
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, "expected a JSON object"
+                continue
+            yield line_no, record
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in e.errors()
+    )
+
+
+class TodoImportService:
+    def __init__(self, db: AsyncSession):
+        self.todos_controller = TodosController(db)
+
+    async def import_todos(
+        self,
+        user_id: int,
+        chunks: AsyncIterator[bytes],
+        import_format: TodoFileFormat,
+        on_progress: ProgressCallback | None = None,
+    ) -> TodoImportReport:
+        report = TodoImportReport()
+        batch: list[tuple] = []
+
+        def fail(line: int, error: str) -> None:
+            report.failed += 1
+            if len(report.errors) < containts.IMPORT_MAX_REPORTED_ERRORS:
+                report.errors.append(TodoImportError(line=line, error=error))
+
+        async def flush() -> None:
+            report.imported += await self.todos_controller.copy_todos(user_id, batch)
+            batch.clear()
+            await bump_todos_version(user_id)
+            logger.info(
+                f"Todo import for user {user_id}: "
+                f"{report.imported} imported, {report.failed} failed"
+            )
+            if on_progress is not None:
+                result = on_progress(report)
+                if result is not None:
+                    await result
+
+        async for line_no, record in iter_records(chunks, import_format):
+            if isinstance(record, str):
+                fail(line_no, record)
+                continue
+            try:
+                todo = TodoSchema.model_validate(record)
+            except ValidationError as e:
+                fail(line_no, _validation_message(e))
+                continue
+            if todo.title is None or todo.description is None:
+                fail(line_no, "title and description are required")
+                continue
+            batch.append((todo.title, todo.description, bool(todo.completed)))
+            if len(batch) >= containts.IMPORT_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+        return report
@@ -1,39 +1,58 @@
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
 
-from fastapi_mail import ConnectionConfig, FastMail, MessageType, MessageSchema
-from fastapi_mail.errors import ConnectionErrors
-from pydantic import EmailStr
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
+from src.controllers.email_outbox_controllers import EmailOutboxController
 from src.core.email_token import create_email_token
 
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    autoescape=select_autoescape(["html"]),
 )
 
 
-async def send_email(email: EmailStr, username: str, host: str):
-    try:
-        token_verify = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={"username": username, "token": token_verify, "host": host},
-            subtype=MessageType.html,
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="email_template.html")
-
-    except ConnectionErrors as err:
-        print(err)
+def enqueue_verification_email(db: AsyncSession, email: str, username: str, host: str):
+    """Stage the confirmation mail in ``db``'s transaction; it goes out once
+    the caller commits."""
+    EmailOutboxController(db).enqueue(
+        email,
+        "Confirm your email",
+        "verify_email.html",
+        {
+            "username": username,
+            "token": create_email_token({"sub": email}),
+            "host": host,
+        },
+    )
+
+
+def render_email(recipient: str, subject: str, template: str, context: dict):
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(templates.get_template(template).render(**context), "html")
+    return message
+
+
+def smtp_client() -> aiosmtplib.SMTP:
+    credentials = {}
+    if settings.USE_CREDENTIALS:
+        credentials = {
+            "username": settings.MAIL_USERNAME,
+            "password": settings.MAIL_PASSWORD,
+        }
+    return aiosmtplib.SMTP(
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        use_tls=settings.MAIL_SSL_TLS,
+        start_tls=settings.MAIL_STARTTLS,
+        validate_certs=settings.VALIDATE_CERTS,
+        timeout=settings.EMAIL_SMTP_TIMEOUT_SECONDS,
+        **credentials,
+    )
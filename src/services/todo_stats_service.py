@@ -0,0 +1,29 @@
+import logging
+
+from src.conf import containts
+from src.controllers.todo_stats_controllers import TodoStatsController
+from src.database.db import sessionmanager
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def reconcile_todo_stats(
+    batch_size: int = containts.TODO_STATS_RECONCILE_BATCH_SIZE,
+) -> int:
+    """Walk all users in id order and repair drifted todo_stats rows.
+
+    Each batch commits on its own, so row locks are short and a failure
+    part-way only loses the current batch until the next run.
+    """
+    after_id, repaired = 0, 0
+    while True:
+        async with sessionmanager.session() as db:
+            after_id, fixed = await TodoStatsController(db).reconcile_batch(
+                after_id, batch_size
+            )
+        if not after_id:
+            break
+        repaired += fixed
+    if repaired:
+        logger.warning(f"Reconciled todo stats for {repaired} users")
+    return repaired
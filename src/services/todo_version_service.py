@@ -0,0 +1,54 @@
+import logging
+import secrets
+
+from redis.exceptions import RedisError
+
+from src.database.redis_db import redis_client
+
+logger = logging.getLogger("uvicorn.error")
+
+VERSION_TTL_SECONDS = 30 * 24 * 3600
+
+
+def _key(user_id: int) -> str:
+    return f"todos_ver:{user_id}"
+
+
+async def get_todos_version(user_id: int) -> str | None:
+    """Current version of the user's todo list, or None if Redis is down.
+
+    Missing counters start from a random value so a flushed or expired key
+    never reproduces an ETag a client already holds.
+    """
+    key = _key(user_id)
+    try:
+        version = await redis_client.get(key)
+        if version is None:
+            await redis_client.set(
+                key, secrets.randbits(48), nx=True, ex=VERSION_TTL_SECONDS
+            )
+            version = await redis_client.get(key)
+    except RedisError as e:
+        logger.warning(f"Failed to read todos version: {e}")
+        return None
+    return version.decode() if version is not None else None
+
+
+async def bump_todos_version(user_id: int) -> None:
+    """Called after the write commits. If the bump fails the key is dropped
+    instead, so the next read reseeds a random version rather than serving
+    304s for the old list until the key expires."""
+    key = _key(user_id)
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(key, secrets.randbits(48), nx=True)
+            pipe.incr(key)
+            pipe.expire(key, VERSION_TTL_SECONDS)
+            await pipe.execute()
+        return
+    except RedisError as e:
+        logger.warning(f"Failed to bump todos version: {e}")
+    try:
+        await redis_client.delete(key)
+    except RedisError as e:
+        logger.error(f"Failed to drop stale todos version {key}: {e}")
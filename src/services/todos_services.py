@@ -1,13 +1,70 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from src.conf import containts
 from src.controllers.todos_controllers import TodosController
+from src.core.cursor import encode_cursor, decode_cursor
+from src.core.etag import make_etag, query_digest
+from src.database.db import sessionmanager
 from src.models.models import User
 from src.schemas.todo_schemas import (
     TodoSchemaUpdate,
     TodoUpdateStatusSchema,
     TodoSchema,
+    TodoBulkStatusItem,
+    TodoFilterParams,
 )
+from src.services.todo_version_service import bump_todos_version, get_todos_version
+
+TodoFileFormat = Literal["ndjson", "csv"]
+EXPORT_FIELDS = ("id", "title", "description", "completed", "created_at", "updated_at")
+
+
+def _export_values(row) -> tuple:
+    return (
+        row.id,
+        row.title,
+        row.description,
+        row.completed,
+        row.created_at.isoformat(),
+        row.updated_at.isoformat(),
+    )
+
+
+def _encode_list_cursor(row, filters: TodoFilterParams) -> str:
+    value = getattr(row, filters.sort)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return encode_cursor(
+        {"k": filters.sort, "o": filters.order, "v": value, "id": row.id}
+    )
+
+
+def _decode_list_cursor(cursor: str, filters: TodoFilterParams) -> tuple:
+    data = decode_cursor(cursor)
+    # Cursors issued before sorting existed only carry the id.
+    key, order = data.get("k", "id"), data.get("o", "asc")
+    after_id, value = data.get("id"), data.get("v", data.get("id"))
+    try:
+        if (key, order) != (filters.sort, filters.order):
+            raise ValueError("cursor was issued for a different sort")
+        if not isinstance(after_id, int):
+            raise ValueError("cursor id must be an integer")
+        if key in ("created_at", "updated_at"):
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str if key == "title" else int):
+            raise ValueError("cursor value has the wrong type")
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return value, after_id
 
 
 class TodosServices:
@@ -20,16 +77,62 @@ class TodosServices:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
             )
+        await bump_todos_version(user.id)
         return todo
 
-    async def get_todos(self, limit: int, offset: int, user: User):
-        todos = await self.todos_controller.get_todos(limit, offset, user)
+    @staticmethod
+    async def get_todos_etag(
+        query_items: list[tuple[str, str]], user: User
+    ) -> str | None:
+        version = await get_todos_version(user.id)
+        if version is None:
+            return None
+        return make_etag(user.id, version, query_digest(query_items))
+
+    @staticmethod
+    def get_todo_etag(todo) -> str:
+        return make_etag(todo.id, todo.updated_at.isoformat())
+
+    async def get_todos(
+        self, limit: int, offset: int, user: User, filters: TodoFilterParams
+    ):
+        todos = await self.todos_controller.get_todos(limit, offset, user, filters)
         if todos is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
             )
         return todos
 
+    async def get_todos_page(
+        self, limit: int, cursor: str, user: User, filters: TodoFilterParams
+    ):
+        after = _decode_list_cursor(cursor, filters) if cursor else None
+        todos = await self.todos_controller.get_todos_after(limit, after, user, filters)
+        next_cursor = None
+        if limit and len(todos) == limit:
+            next_cursor = _encode_list_cursor(todos[-1], filters)
+        return {"items": todos, "next_cursor": next_cursor}
+
+    async def search_todos(self, query: str, limit: int, cursor: str, user: User):
+        after = None
+        if cursor:
+            data = decode_cursor(cursor)
+            after = (data.get("rank"), data.get("id"))
+            if not isinstance(after[0], (int, float)) or not isinstance(after[1], int):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
+        todos = await self.todos_controller.search_todos(query, limit, after, user)
+        next_cursor = None
+        if limit and len(todos) == limit:
+            next_cursor = encode_cursor({"rank": todos[-1].rank, "id": todos[-1].id})
+        return {"items": todos, "next_cursor": next_cursor}
+
+    async def get_todo_stats(self, user: User) -> dict:
+        stats = await self.todos_controller.stats.get_stats(user.id)
+        total, completed = (stats.total, stats.completed) if stats else (0, 0)
+        return {"total": total, "completed": completed, "open": total - completed}
+
     async def get_todo_by_id(self, todo_id: int, user: User):
         todo = await self.todos_controller.get_todo_by_id(todo_id, user)
         if todo is None:
@@ -44,6 +147,7 @@ class TodosServices:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
             )
+        await bump_todos_version(user.id)
         return update_todo
 
     async def update_todo_status(
@@ -54,7 +158,70 @@ class TodosServices:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
             )
+        await bump_todos_version(user.id)
         return update_status
 
     async def remove_todo(self, todo_id: int, user: User):
-        return await self.todos_controller.remove_todo(todo_id, user)
+        await self.todos_controller.remove_todo(todo_id, user)
+        await bump_todos_version(user.id)
+
+    async def create_todos(self, todos: list[TodoSchema], user: User):
+        rows = await self.todos_controller.create_todos(todos, user)
+        await bump_todos_version(user.id)
+        return [{"id": row.id, "status": "created", "todo": row} for row in rows]
+
+    async def update_todos_status(self, items: list[TodoBulkStatusItem], user: User):
+        statuses = {item.id: item.completed for item in items}
+        updated = await self.todos_controller.update_todos_status(statuses, user)
+        if updated:
+            await bump_todos_version(user.id)
+        return [
+            (
+                {"id": item.id, "status": "updated", "todo": updated[item.id]}
+                if item.id in updated
+                else {"id": item.id, "status": "not_found"}
+            )
+            for item in items
+        ]
+
+    async def remove_todos(self, ids: list[int], user: User):
+        deleted = await self.todos_controller.remove_todos(list(set(ids)), user)
+        if deleted:
+            await bump_todos_version(user.id)
+        return [
+            {"id": _id, "status": "deleted" if _id in deleted else "not_found"}
+            for _id in ids
+        ]
+
+    async def export_todos(
+        self, user_id: int, export_format: TodoFileFormat
+    ) -> AsyncIterator[str]:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+        async for rows in self.todos_controller.stream_todos(
+            user_id, containts.EXPORT_BATCH_SIZE
+        ):
+            if export_format == "csv":
+                writer.writerows(_export_values(row) for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_FIELDS, _export_values(row)))) + "\n"
+                    for row in rows
+                )
+        if export_format == "csv" and buffer.tell():
+            yield buffer.getvalue()
+
+
+async def stream_todos_export(
+    user_id: int, export_format: TodoFileFormat
+) -> AsyncIterator[str]:
+    # The request's get_db session is closed before a StreamingResponse body
+    # is sent, so the export holds its own session for the whole stream.
+    async with sessionmanager.session() as db:
+        async for chunk in TodosServices(db).export_todos(user_id, export_format):
+            yield chunk
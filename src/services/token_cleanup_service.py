@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+import logging
+import time
+
+from src.conf.config import settings
+from src.controllers.refresh_token_controllers import RefreshTokenController
+from src.core.metrics import (
+    TOKEN_CLEANUP_DELETED,
+    TOKEN_CLEANUP_LAST_DELETED,
+    TOKEN_CLEANUP_SECONDS,
+    TOKEN_PARTITIONS,
+    TOKEN_PARTITIONS_DROPPED,
+)
+from src.database.db import sessionmanager
+from src.schemas.token_schemas import TokenCleanupReport
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def cleanup_expired_tokens(days_ahead: int | None = None) -> TokenCleanupReport:
+    """Drop refresh_tokens partitions whose whole day has expired and make
+    sure partitions exist for every expires_at a new token can get.
+
+    Dropping a partition is a catalog change, so it costs the same whatever
+    the number of rows and leaves no dead tuples behind.
+    """
+    if days_ahead is None:
+        days_ahead = settings.REFRESH_TOKEN_PARTITION_DAYS_AHEAD
+    today = datetime.now(timezone.utc).date()
+    horizon = today + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS + days_ahead)
+    report = TokenCleanupReport()
+    started = time.perf_counter()
+    async with sessionmanager.session() as db:
+        controller = RefreshTokenController(db)
+        partitions = await controller.get_partitions()
+        day = today
+        while day <= horizon:
+            if day not in partitions:
+                await controller.create_partition(day)
+                report.partitions_created += 1
+            day += timedelta(days=1)
+        # The partition for day D holds expires_at in [D, D + 1 day).
+        for day, rows in sorted(partitions.items()):
+            if day < today:
+                await controller.drop_partition(day)
+                report.partitions_dropped += 1
+                report.deleted += int(rows)
+    report.duration_seconds = time.perf_counter() - started
+
+    TOKEN_CLEANUP_DELETED.inc(report.deleted)
+    TOKEN_CLEANUP_LAST_DELETED.set(report.deleted)
+    TOKEN_CLEANUP_SECONDS.observe(report.duration_seconds)
+    TOKEN_PARTITIONS_DROPPED.inc(report.partitions_dropped)
+    TOKEN_PARTITIONS.set(
+        len(partitions) + report.partitions_created - report.partitions_dropped
+    )
+    logger.info(
+        f"Token cleanup dropped {report.partitions_dropped} partitions "
+        f"(~{report.deleted} rows), created {report.partitions_created} "
+        f"in {report.duration_seconds:.2f}s"
+    )
+    return report
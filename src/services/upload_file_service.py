@@ -1,8 +1,23 @@
+import asyncio
+import io
+import mimetypes
+from abc import ABC, abstractmethod
+from pathlib import Path
+
 import cloudinary
 import cloudinary.uploader
 
+from src.conf.config import settings
+
+
+class AvatarStorage(ABC):
+    """Where processed avatars end up; ``save`` returns the public URL."""
+
+    @abstractmethod
+    async def save(self, key: str, data: bytes, content_type: str) -> str: ...
 
-class UploadFileService:
+
+class CloudinaryStorage(AvatarStorage):
     def __init__(self, cloud_name, api_key, api_secret):
         self.cloud_name = cloud_name
         self.api_key = api_key
@@ -14,11 +29,48 @@ class UploadFileService:
             api_secret=self.api_secret,
         )
 
-    @staticmethod
-    def upload_file(file, username):
-        public_id = f"Restapi/{username}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        public_id = f"Restapi/{key}"
+        # The SDK is blocking (requests under the hood), keep it off the loop.
+        r = await asyncio.to_thread(
+            cloudinary.uploader.upload,
+            io.BytesIO(data),
+            public_id=public_id,
+            overwrite=True,
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            version=r.get("version"), secure=True
         )
-        return src_url
+
+
+class LocalStorage(AvatarStorage):
+    """Writes avatars under ``root``; meant for development and tests."""
+
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Avatar key escapes the storage root: {name!r}")
+        return path
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        name = key + (mimetypes.guess_extension(content_type) or "")
+        await asyncio.to_thread(self._write, self._path(name), data)
+        return f"{self.base_url}/{name}"
+
+
+def get_avatar_storage() -> AvatarStorage:
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_LOCAL_URL)
+    return CloudinaryStorage(
+        settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
+    )
@@ -0,0 +1,114 @@
+import json
+import logging
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.core.cache import TTLCache
+from src.database.redis_db import redis_client
+from src.schemas.user_schemas import UserSnapshot
+
+logger = logging.getLogger("uvicorn.error")
+
+# Fill the hash only if no invalidation happened since the caller read the
+# generation, i.e. the snapshot it loaded from the database is still current.
+SET_IF_CURRENT_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+  return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class UserCache:
+    """Two-tier cache of authenticated users: in-process LRU over a Redis hash.
+
+    Every ``invalidate`` bumps a per-user generation. A miss is filled with
+    ``set(user, generation)`` using the generation read *before* the database
+    lookup, so a snapshot loaded before a concurrent change is dropped
+    instead of overwriting the invalidation.
+    """
+
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int):
+        self.local = TTLCache(maxsize, local_ttl)
+        self.redis_ttl = redis_ttl
+        self._set_script = redis_client.register_script(SET_IF_CURRENT_SCRIPT)
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f"user:{username}"
+
+    @staticmethod
+    def _generation_key(username: str) -> str:
+        return f"user_gen:{username}"
+
+    async def get(self, username: str) -> UserSnapshot | None:
+        user = self.local.get(username)
+        if user is not None:
+            return user
+        try:
+            data = await redis_client.hgetall(self._key(username))
+        except RedisError as e:
+            logger.warning(f"User cache read failed: {e}")
+            return None
+        if not data:
+            return None
+        try:
+            user = UserSnapshot.model_validate(
+                {key.decode(): json.loads(value) for key, value in data.items()}
+            )
+        except (ValidationError, ValueError):
+            return None
+        self.local.set(username, user)
+        return user
+
+    async def generation(self, username: str) -> str | None:
+        """Current generation of ``username``, or None if Redis is unavailable."""
+        try:
+            value = await redis_client.get(self._generation_key(username))
+        except RedisError as e:
+            logger.warning(f"User cache read failed: {e}")
+            return None
+        return value.decode() if value is not None else "0"
+
+    async def set(self, user: UserSnapshot, generation: str | None) -> None:
+        if generation is None:
+            # Redis was unavailable; keep the short-lived local copy only
+            self.local.set(user.username, user)
+            return
+        fields = []
+        for field, value in user.model_dump(mode="json").items():
+            fields += [field, json.dumps(value)]
+        try:
+            stored = await self._set_script(
+                keys=[self._key(user.username), self._generation_key(user.username)],
+                args=[generation, self.redis_ttl, *fields],
+            )
+        except RedisError as e:
+            logger.warning(f"User cache write failed: {e}")
+            return
+        if stored:
+            self.local.set(user.username, user)
+
+    async def invalidate(self, username: str) -> None:
+        self.local.pop(username)
+        generation_key = self._generation_key(username)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(generation_key)
+                # must outlive any fill that read the previous generation
+                pipe.expire(generation_key, self.redis_ttl)
+                pipe.delete(self._key(username))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"User cache invalidation failed: {e}")
+
+
+user_cache = UserCache(
+    settings.USER_CACHE_SIZE,
+    settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    settings.USER_CACHE_REDIS_TTL_SECONDS,
+)
@@ -4,6 +4,8 @@ from src.controllers.user_controllers import UsersController
 from src.schemas.user_schemas import UserCreate
 from src.models.models import User
 from src.services.auth_service import AuthService
+from src.services.service_email import enqueue_verification_email
+from src.services.user_cache import user_cache
 
 
 class UserService:
@@ -12,10 +14,14 @@ class UserService:
         self.user_controller = UsersController(self.db)
         self.auth_service = AuthService(self.db)
 
-    async def create_user(self, user_data: UserCreate) -> User:
-        user = await self.auth_service.register_user(user_data)
+    async def create_user(self, user_data: UserCreate, host: str) -> User:
+        user = await self.auth_service.register_user(user_data, host)
         return user
 
+    async def request_verification_email(self, user: User, host: str) -> None:
+        enqueue_verification_email(self.db, user.email, user.username, host)
+        await self.db.commit()
+
     async def get_by_username(self, username: str) -> User | None:
         return await self.user_controller.get_by_username(username)
 
@@ -24,7 +30,14 @@ class UserService:
 
     async def confirmed_email(self, email: str) -> User | None:
         user = await self.user_controller.confirmed_email(email)
+        if user is not None:
+            await user_cache.invalidate(user.username)
         return user
 
-    async def update_avatar_url(self, email: str, url: str) -> User:
-        return await self.user_controller.update_avatar_url(email, url)
+    async def update_avatar_url(
+        self, email: str, url: str, avatar_hash: str | None = None
+    ) -> User | None:
+        user = await self.user_controller.update_avatar_url(email, url, avatar_hash)
+        if user is not None:
+            await user_cache.invalidate(user.username)
+        return user
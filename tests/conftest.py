@@ -0,0 +1,128 @@
+import os
+import uuid
+
+import jwt
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import text
+
+import src.core.depend_service as depend_service
+import src.core.rate_limit as rate_limit
+import src.core.revocation as revocation
+import src.database.db as db
+import src.services.auth_service as auth_service
+import src.services.todo_version_service as todo_version_service
+import src.services.todos_services as todos_services
+import src.services.user_cache as user_cache_module
+from src.conf.config import settings
+from src.core.cache import TTLCache
+from src.database.db import DatabaseSessionManager
+from src.services.user_cache import SET_IF_CURRENT_SCRIPT, user_cache
+
+# A database migrated with ``alembic upgrade head``; tests that need
+# Postgres are skipped without it.
+TEST_DB_URL = os.environ.get("TEST_DB_URL")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def access_token(username: str) -> str:
+    return jwt.encode(
+        {"sub": username, "exp": 2**31}, settings.SECRET_KEY, settings.ALGORITHM
+    )
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """One fakeredis shared by every module that talks to Redis, with the
+    user cache emptied."""
+    redis = FakeRedis(server=FakeServer())
+    for module in (
+        db,
+        rate_limit,
+        revocation,
+        auth_service,
+        todo_version_service,
+        user_cache_module,
+    ):
+        monkeypatch.setattr(module, "redis_client", redis)
+    monkeypatch.setattr(
+        user_cache, "_set_script", redis.register_script(SET_IF_CURRENT_SCRIPT)
+    )
+    monkeypatch.setattr(
+        rate_limit.rate_limiter,
+        "_script",
+        redis.register_script(rate_limit.GCRA_SCRIPT),
+    )
+    monkeypatch.setattr(
+        user_cache,
+        "local",
+        TTLCache(maxsize=100, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS),
+    )
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    return redis
+
+
+@pytest.fixture
+async def replicated_db(tmp_path, monkeypatch, fake_redis):
+    """A primary and a replica SQLite database, each holding a ``marker`` row
+    that names it, installed as the app's session manager with pins kept in
+    fakeredis."""
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        [f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"],
+    )
+    for engine, name in zip(manager.engines, ("primary", "replica")):
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+            await conn.execute(
+                text("INSERT INTO marker VALUES (:name)"), {"name": name}
+            )
+    monkeypatch.setattr(db, "sessionmanager", manager)
+    monkeypatch.setattr(
+        db, "_local_pins", TTLCache(maxsize=100, ttl=settings.DB_REPLICA_PIN_SECONDS)
+    )
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture
+async def postgres_db(monkeypatch, fake_redis):
+    """The app's session manager on ``TEST_DB_URL``."""
+    if TEST_DB_URL is None:
+        pytest.skip("TEST_DB_URL is not set")
+    manager = DatabaseSessionManager(TEST_DB_URL)
+    for module in (db, depend_service, todos_services):
+        monkeypatch.setattr(module, "sessionmanager", manager)
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture
+async def db_user(postgres_db):
+    """An unconfirmed user, removed with everything it owns afterwards.
+    Yields ``(id, username, email)``."""
+    username = f"test_{uuid.uuid4().hex[:12]}"
+    email = f"{username}@example.com"
+    async with postgres_db.session() as session:
+        result = await session.execute(
+            text(
+                "INSERT INTO users (username, email, hash_password, role, confirmed) "
+                "VALUES (:username, :email, 'x', 'USER', false) RETURNING id"
+            ),
+            {"username": username, "email": email},
+        )
+        user_id = result.scalar_one()
+        await session.commit()
+    yield user_id, username, email
+    async with postgres_db.session() as session:
+        for table in ("todos", "todo_stats"):
+            await session.execute(
+                text(f"DELETE FROM {table} WHERE user_id = :id"), {"id": user_id}
+            )
+        await session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        await session.commit()
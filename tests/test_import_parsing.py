@@ -0,0 +1,46 @@
+import pytest
+
+from src.conf import containts
+from src.services.import_service import iter_records
+
+pytestmark = pytest.mark.anyio
+
+
+async def records(data: bytes, chunk_size: int = 7, import_format: str = "ndjson"):
+    async def chunks():
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    return [item async for item in iter_records(chunks(), import_format)]
+
+
+async def test_invalid_utf8_is_a_line_error():
+    data = b'{"title": "ok"}\n{"title": "\xff\xfe"}\n{"title": "next"}\n'
+
+    result = await records(data)
+
+    assert result[0] == (1, {"title": "ok"})
+    assert result[1][0] == 2 and result[1][1].startswith("invalid UTF-8")
+    assert result[2] == (3, {"title": "next"})
+
+
+async def test_overlong_line_is_skipped_without_buffering_it(monkeypatch):
+    monkeypatch.setattr(containts, "IMPORT_MAX_LINE_BYTES", 32)
+    data = b'{"title": "a"}\r\n' + b"x" * 1000 + b'\n{"title": "b"}'
+
+    result = await records(data, chunk_size=10)
+
+    assert result[0] == (1, {"title": "a"})
+    assert result[1] == (2, "line longer than 32 bytes")
+    assert result[2] == (3, {"title": "b"})
+
+
+async def test_csv_rows_follow_the_header():
+    data = b"title,description\nMilk,Buy milk\nbad\n"
+
+    result = await records(data, import_format="csv")
+
+    assert result == [
+        (2, {"title": "Milk", "description": "Buy milk"}),
+        (3, "expected 2 columns, got 1"),
+    ]
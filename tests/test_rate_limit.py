@@ -0,0 +1,62 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.conf.config import settings
+from src.core.rate_limit import limit_by_ip, limit_login_by_username, rate_limiter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def limits(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN_PER_USERNAME", 2)
+    return fake_redis
+
+
+@pytest.fixture
+async def client(limits):
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(limit_by_ip("limited", 2, 60))])
+    async def limited():
+        return {}
+
+    @app.post("/login", dependencies=[Depends(limit_login_by_username)])
+    async def login():
+        return {}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def test_burst_is_allowed_then_limited(limits):
+    hits = [await rate_limiter.hit("rl:test:burst", 3, 60) for _ in range(4)]
+
+    assert hits[:3] == [0, 0, 0]
+    # one request every 20 s once the burst is spent
+    assert 19 < hits[3] <= 20
+
+
+async def test_limited_request_gets_429_with_retry_after(client):
+    statuses = [(await client.get("/limited")).status_code for _ in range(2)]
+    response = await client.get("/limited")
+
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 30
+
+
+async def test_login_is_limited_per_username(client, limits):
+    def attempt(username: str):
+        return client.post("/login", data={"username": username, "password": "x"})
+
+    assert (await attempt("alice")).status_code == 200
+    assert (await attempt("Alice")).status_code == 200
+    assert (await attempt("ALICE")).status_code == 429
+    # same client IP, different account
+    assert (await attempt("bob")).status_code == 200
+    assert await limits.exists("rl:login:user:alice")
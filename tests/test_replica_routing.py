@@ -0,0 +1,85 @@
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from starlette.requests import Request
+
+import src.core.depend_service as depend_service
+import src.database.db as db
+from src.models.models import UserRole
+from src.schemas.user_schemas import UserSnapshot
+from src.services.auth_service import AuthService
+from tests.conftest import access_token
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer_request(method: str, username: str | None) -> Request:
+    headers = []
+    if username is not None:
+        headers.append((b"authorization", f"Bearer {access_token(username)}".encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+async def read_marker(request: Request) -> str:
+    sessions = db.get_read_db(request)
+    session = await anext(sessions)
+    try:
+        result = await session.execute(text("SELECT name FROM marker"))
+        return result.scalar_one()
+    finally:
+        await sessions.aclose()
+
+
+async def test_unpinned_reads_go_to_the_replica(replicated_db):
+    assert await read_marker(bearer_request("GET", None)) == "replica"
+    assert await read_marker(bearer_request("GET", "alice")) == "replica"
+
+
+async def test_pinned_user_reads_from_the_primary(replicated_db):
+    await db.pin_to_primary("alice")
+
+    assert await read_marker(bearer_request("GET", "alice")) == "primary"
+    assert await read_marker(bearer_request("GET", "bob")) == "replica"
+
+
+async def test_pin_is_shared_through_redis(replicated_db):
+    await db.pin_to_primary("alice")
+    # another worker: no local pin, only the Redis key
+    db._local_pins.pop("alice")
+
+    assert await read_marker(bearer_request("GET", "alice")) == "primary"
+
+
+async def test_writes_pin_after_the_handler_commits(replicated_db, monkeypatch):
+    async def fake_current_user(self, token):
+        return UserSnapshot(
+            id=1,
+            username="alice",
+            email="alice@example.com",
+            role=UserRole.USER,
+            confirmed=True,
+        )
+
+    monkeypatch.setattr(AuthService, "get_current_user", fake_current_user)
+    app = FastAPI()
+
+    @app.post("/write")
+    async def write(user=Depends(depend_service.get_current_user)):
+        return {"pinned_during_handler": await db.is_pinned_to_primary("alice")}
+
+    @app.get("/read")
+    async def read(user=Depends(depend_service.get_current_user)):
+        return {}
+
+    headers = {"Authorization": f"Bearer {access_token('alice')}"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/read", headers=headers)
+        assert not await db.is_pinned_to_primary("alice")
+
+        response = await client.post("/write", headers=headers)
+
+    assert response.json() == {"pinned_during_handler": False}
+    assert await db.is_pinned_to_primary("alice")
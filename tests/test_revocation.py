@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from src.core.revocation import RevocationFilter
+from src.core.token_cache import token_digest
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "header.payload.signature"
+
+
+async def wait_for(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+async def revocations(fake_redis):
+    revocations = RevocationFilter(
+        capacity=100, error_rate=0.01, redis_timeout=1, retry_delay=60
+    )
+    yield revocations
+    await revocations.stop()
+
+
+async def test_listener_keeps_the_filter_current(revocations):
+    revocations.start()
+    await wait_for(lambda: revocations.ready)
+
+    await revocations.publish(TOKEN)
+
+    assert revocations.might_be_revoked(token_digest(TOKEN))
+
+
+async def test_reload_while_listener_is_down_still_asks_redis(
+    revocations, fake_redis, caplog
+):
+    server = fake_redis.connection_pool.connection_kwargs["server"]
+    server.connected = False
+    revocations.start()
+    await wait_for(lambda: "listener disconnected" in caplog.text)
+    server.connected = True
+
+    # the scheduled reload, while the listener waits to resubscribe
+    await revocations.load()
+    # revoked by another worker; the publish reaches nobody here
+    await fake_redis.set(f"bl:{TOKEN}", "1")
+
+    assert not revocations.ready
+    assert await revocations.is_revoked(TOKEN)
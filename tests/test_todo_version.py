@@ -0,0 +1,32 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.services.todo_version_service import bump_todos_version, get_todos_version
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bump_changes_the_version(fake_redis):
+    before = await get_todos_version(1)
+    await bump_todos_version(1)
+
+    assert await get_todos_version(1) != before
+
+
+async def test_failed_bump_drops_the_version(fake_redis, monkeypatch):
+    before = await get_todos_version(1)
+
+    def broken_pipeline(*args, **kwargs):
+        raise ConnectionError("Connection reset by peer")
+
+    monkeypatch.setattr(fake_redis, "pipeline", broken_pipeline)
+    await bump_todos_version(1)
+
+    assert not await fake_redis.exists("todos_ver:1")
+    assert await get_todos_version(1) != before
+
+
+async def test_bump_with_redis_down_does_not_raise(fake_redis):
+    fake_redis.connection_pool.connection_kwargs["server"].connected = False
+
+    await bump_todos_version(1)
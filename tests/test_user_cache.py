@@ -0,0 +1,37 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+import src.services.user_cache as user_cache_module
+from src.models.models import UserRole
+from src.schemas.user_schemas import UserSnapshot
+from src.services.user_cache import UserCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(user_cache_module, "redis_client", FakeRedis())
+    return UserCache(maxsize=10, local_ttl=30, redis_ttl=300)
+
+
+def snapshot(role: UserRole) -> UserSnapshot:
+    return UserSnapshot(
+        id=1, username="alice", email="alice@example.com", role=role, confirmed=True
+    )
+
+
+async def test_fill_is_served_from_redis(cache):
+    await cache.set(snapshot(UserRole.USER), await cache.generation("alice"))
+    cache.local.pop("alice")
+
+    assert await cache.get("alice") == snapshot(UserRole.USER)
+
+
+async def test_fill_read_before_invalidate_is_dropped(cache):
+    generation = await cache.generation("alice")
+    stale = snapshot(UserRole.USER)  # loaded from the database here
+    await cache.invalidate("alice")  # a concurrent role change commits
+    await cache.set(stale, generation)
+
+    assert await cache.get("alice") is None
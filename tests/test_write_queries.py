@@ -0,0 +1,149 @@
+"""Statements issued by each write endpoint.
+
+Writes go through ``INSERT/UPDATE/DELETE ... RETURNING`` with no follow-up
+refresh, so each costs one statement, plus the ``todo_stats`` counter
+upsert when the counts change and a ``SELECT ... FOR UPDATE`` when the
+``completed`` flag may flip. COMMIT is not a statement. Needs Postgres:
+run with ``TEST_DB_URL`` pointing at a database migrated with
+``alembic upgrade head``.
+"""
+
+import io
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
+
+from main import app
+from src.conf.config import settings
+from src.core.email_token import create_email_token
+from src.database.db import assert_max_queries
+from tests.conftest import access_token
+
+pytestmark = pytest.mark.anyio
+
+API = "/api/v1"
+TODO = {"title": "Write the tests", "description": "Count the statements"}
+
+
+@pytest.fixture
+async def client(db_user, tmp_path, monkeypatch):
+    """Client authenticated as ``db_user`` whose user is already cached, so
+    the counts below cover the endpoint and not the user lookup."""
+    monkeypatch.setattr(settings, "AVATAR_STORAGE", "local")
+    monkeypatch.setattr(settings, "AVATAR_LOCAL_DIR", str(tmp_path))
+    _, username, _ = db_user
+    headers = {"Authorization": f"Bearer {access_token(username)}"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test", headers=headers
+    ) as client:
+        response = await client.get(f"{API}/users/me")
+        assert response.status_code == 200
+        yield client
+
+
+async def create_todos(client: AsyncClient, count: int) -> list[int]:
+    response = await client.post(f"{API}/todos/bulk", json={"items": [TODO] * count})
+    assert response.status_code == 201
+    return [item["id"] for item in response.json()]
+
+
+async def test_create_todo(client):
+    with assert_max_queries(2):
+        response = await client.post(f"{API}/todos/", json=TODO)
+
+    assert response.status_code == 201
+
+
+async def test_update_todo(client):
+    [todo_id] = await create_todos(client, 1)
+
+    with assert_max_queries(1):
+        response = await client.put(
+            f"{API}/todos/{todo_id}", json={**TODO, "title": "Renamed"}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+
+
+async def test_update_missing_todo_is_one_statement(client):
+    with assert_max_queries(1):
+        response = await client.put(f"{API}/todos/0", json=TODO)
+
+    assert response.status_code == 404
+
+
+async def test_update_todo_status(client):
+    [todo_id] = await create_todos(client, 1)
+
+    with assert_max_queries(3):
+        response = await client.patch(
+            f"{API}/todos/{todo_id}", json={"completed": True}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+
+async def test_delete_todo(client):
+    [todo_id] = await create_todos(client, 1)
+
+    with assert_max_queries(2):
+        response = await client.delete(f"{API}/todos/{todo_id}")
+
+    assert response.status_code == 204
+
+
+async def test_create_todos_in_bulk(client):
+    with assert_max_queries(2):
+        response = await client.post(f"{API}/todos/bulk", json={"items": [TODO] * 10})
+
+    assert response.status_code == 201
+
+
+async def test_update_todos_status_in_bulk(client):
+    ids = await create_todos(client, 10)
+    items = [{"id": todo_id, "completed": True} for todo_id in ids]
+
+    with assert_max_queries(3):
+        response = await client.patch(f"{API}/todos/bulk", json={"items": items})
+
+    assert response.status_code == 200
+
+
+async def test_delete_todos_in_bulk(client):
+    ids = await create_todos(client, 10)
+
+    with assert_max_queries(2):
+        response = await client.request(
+            "DELETE", f"{API}/todos/bulk", json={"ids": ids}
+        )
+
+    assert response.status_code == 200
+
+
+async def test_confirm_email(client, db_user):
+    _, _, email = db_user
+    token = create_email_token({"sub": email})
+
+    # the lookup that tells "already confirmed" apart, then the UPDATE
+    with assert_max_queries(2):
+        response = await client.get(f"{API}/users/confirmed_email/{token}")
+
+    assert response.json() == {"message": "Email confirmed"}
+
+
+async def test_update_avatar(client):
+    image = io.BytesIO()
+    Image.new("RGB", (32, 32), "teal").save(image, "PNG")
+
+    # the current avatar hash, then the UPDATE
+    with assert_max_queries(2):
+        response = await client.patch(
+            f"{API}/users/avatar",
+            files={"file": ("avatar.png", image.getvalue(), "image/png")},
+        )
+
+    assert response.status_code == 200